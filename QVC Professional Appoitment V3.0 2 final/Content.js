@@ -17,6 +17,15 @@ let timeClicked = false;
 let lastClickTime = Date.now();
 let clickCounter = 0;
 
+// Mutation-driven detection state
+let pageObserver = null;       // watches the document for the calendar appearing/being replaced
+let calendarObserver = null;   // watches only the calendar table
+let timeObserver = null;       // watches for time slots after a date is clicked
+let cachedCalendar = null;
+let selectableCache = new Map(); // td -> selectable?, cleared for cells that mutate
+let scanQueued = false;
+const FALLBACK_SCAN_MS = 30000;  // safety net for style changes no mutation reports
+
 // Create professional panel
 function createPanel() {
   // Remove existing panel if any
@@ -157,9 +166,13 @@ function startMonitoring() {
   addLog('🔄 Clicking page every 2 minutes to keep session alive', '#f39c12');
   addLog(`📧 Email recipients: ${settings.emails.length || 0}`, '#a8dadc');
   
-  // Start scanning for dates (every second)
+  // Scan once, then again whenever the calendar's DOM changes
+  startObservers();
   checkForAvailableDates();
-  monitorInterval = setInterval(checkForAvailableDates, 1000);
+  monitorInterval = setInterval(() => {
+    selectableCache.clear();
+    checkForAvailableDates();
+  }, FALLBACK_SCAN_MS);
   
   // CRITICAL: Click on page every 2 minutes to keep session alive
   performSessionClick(); // Click immediately
@@ -171,7 +184,7 @@ function startMonitoring() {
   chrome.runtime.sendMessage({
     action: 'statusChange',
     status: 'monitoring',
-    message: 'Scanning every second...'
+    message: 'Watching calendar for changes...'
   });
 }
 
@@ -191,6 +204,8 @@ function stopMonitoring() {
     timerInterval = null;
   }
   
+  stopObservers();
+  
   isMonitoring = false;
   stopAlarm();
   
@@ -222,7 +237,7 @@ function performSessionClick() {
   }
   
   // Try to find calendar and click on a date
-  const calendar = findCalendar();
+  const calendar = getCalendar();
   
   if (calendar) {
     // Find all date cells
@@ -309,6 +324,81 @@ function startTimerDisplay() {
   }, 1000);
 }
 
+// ===== Mutation-driven detection =====
+function isPanelNode(node) {
+  const el = node.nodeType === 1 ? node : node.parentElement;
+  return !!(el && el.closest('#qvc-pro-panel'));
+}
+
+function queueScan() {
+  // Coalesce a burst of mutations into one scan
+  if (scanQueued) return;
+  scanQueued = true;
+  queueMicrotask(() => {
+    scanQueued = false;
+    checkForAvailableDates();
+  });
+}
+
+function startObservers() {
+  stopObservers();
+  
+  pageObserver = new MutationObserver(mutations => {
+    // Cheap while the cached calendar is still attached
+    if (cachedCalendar && cachedCalendar.isConnected) return;
+    if (mutations.every(m => isPanelNode(m.target))) return;
+    queueScan();
+  });
+  pageObserver.observe(document.body, { childList: true, subtree: true });
+}
+
+function stopObservers() {
+  [pageObserver, calendarObserver, timeObserver].forEach(o => o && o.disconnect());
+  pageObserver = calendarObserver = timeObserver = null;
+  cachedCalendar = null;
+  selectableCache.clear();
+}
+
+function watchCalendar(calendar) {
+  if (calendarObserver) calendarObserver.disconnect();
+  cachedCalendar = calendar;
+  selectableCache.clear();
+  
+  calendarObserver = new MutationObserver(mutations => {
+    for (const m of mutations) {
+      if (m.type === 'childList' && ['TABLE', 'THEAD', 'TBODY', 'TR'].includes(m.target.nodeName)) {
+        // Rows replaced (e.g. month changed): every cached cell is stale
+        selectableCache.clear();
+        break;
+      }
+      const el = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+      const cell = el && el.closest('td');
+      if (cell) selectableCache.delete(cell);
+      else selectableCache.clear();
+    }
+    queueScan();
+  });
+  calendarObserver.observe(calendar, {
+    childList: true,
+    subtree: true,
+    characterData: true,
+    attributes: true,
+    attributeFilter: ['class', 'style', 'disabled']
+  });
+  addLog('👀 Calendar found - watching it for changes', '#4facfe');
+}
+
+function getCalendar() {
+  if (cachedCalendar && cachedCalendar.isConnected) return cachedCalendar;
+  const calendar = findCalendar();
+  if (calendar) watchCalendar(calendar);
+  else if (cachedCalendar) {
+    cachedCalendar = null;
+    selectableCache.clear();
+  }
+  return calendar;
+}
+
 function checkForAvailableDates() {
   if (!isMonitoring || dateClicked) return;
   
@@ -326,8 +416,8 @@ function checkForAvailableDates() {
     addLog(`🔍 Scan #${checkCount} - Checking calendar...`, '#95a5a6');
   }
   
-  // Find calendar
-  const calendar = findCalendar();
+  // Find calendar (cached until it is removed from the page)
+  const calendar = getCalendar();
   if (!calendar) {
     if (checkCount % 30 === 0) {
       addLog('⏳ No calendar found yet - waiting...', '#95a5a6');
@@ -382,6 +472,13 @@ function findSelectableDates(calendar) {
       const num = parseInt(text);
       if (num >= 1 && num <= 31) {
         
+        // Reuse the verdict until this cell mutates
+        const cached = selectableCache.get(cell);
+        if (cached !== undefined) {
+          if (cached) selectableDates.push(cell);
+          return;
+        }
+        
         const style = window.getComputedStyle(cell);
         const color = style.color;
         
@@ -396,7 +493,9 @@ function findSelectableDates(calendar) {
           color === 'rgb(0, 0, 0)';
         
         // Date is selectable ONLY if it's black and not disabled
-        if (isBlackColor && !isWeekend && !isHoliday && !isDisabled) {
+        const selectable = isBlackColor && !isWeekend && !isHoliday && !isDisabled;
+        selectableCache.set(cell, selectable);
+        if (selectable) {
           selectableDates.push(cell);
         }
       }
@@ -481,15 +580,10 @@ function handleSelectableDates(dates) {
   }, 2000);
 }
 
-function findAndSelectTimeSlot() {
-  if (timeClicked) return;
-  
-  addLog('⏰ Looking for available time slots...', '#4facfe');
-  
-  const timeElements = document.querySelectorAll('button, div, span');
-  const availableTimes = [];
-  
-  timeElements.forEach(el => {
+function collectTimeSlots(root, into) {
+  const candidates = root.nodeType === 1 ? [root, ...root.querySelectorAll('button, div, span')] : [];
+  candidates.forEach(el => {
+    if (!/^(BUTTON|DIV|SPAN)$/.test(el.nodeName) || isPanelNode(el)) return;
     const text = el.textContent.trim();
     if (text.match(/^\d{1,2}:\d{2}$/)) {
       const isUnavailable = 
@@ -497,38 +591,71 @@ function findAndSelectTimeSlot() {
         el.classList.contains('disabled') ||
         el.disabled;
       
-      if (!isUnavailable) {
-        availableTimes.push(el);
+      if (!isUnavailable && !into.includes(el)) {
+        into.push(el);
       }
     }
   });
+  return into;
+}
+
+function findAndSelectTimeSlot() {
+  if (timeClicked) return;
+  
+  addLog('⏰ Looking for available time slots...', '#4facfe');
   
+  // One full pass, then only look at what changes
+  const availableTimes = collectTimeSlots(document.body, []);
   if (availableTimes.length > 0) {
-    timeClicked = true;
-    
-    addLog(`⏰ Found ${availableTimes.length} available time slots!`, '#43e97b');
-    
-    // Select first time
-    const selectedTime = availableTimes[0];
-    addLog(`✅ Selected time: ${selectedTime.textContent}`, '#43e97b');
-    
-    selectedTime.style.backgroundColor = '#10b981';
-    selectedTime.style.color = 'white';
-    selectedTime.style.fontWeight = 'bold';
+    selectTimeSlot(availableTimes);
+    return;
+  }
+  
+  addLog('⏳ No time slots yet - waiting for them to appear...', '#95a5a6');
+  if (timeObserver) timeObserver.disconnect();
+  timeObserver = new MutationObserver(mutations => {
+    const found = [];
+    for (const m of mutations) {
+      if (isPanelNode(m.target)) continue;
+      if (m.type === 'childList') m.addedNodes.forEach(n => collectTimeSlots(n, found));
+      else collectTimeSlots(m.target, found);
+    }
+    if (found.length > 0) {
+      timeObserver.disconnect();
+      timeObserver = null;
+      selectTimeSlot(found);
+    }
+  });
+  timeObserver.observe(document.body, {
+    childList: true,
+    subtree: true,
+    attributes: true,
+    attributeFilter: ['class', 'disabled']
+  });
+}
+
+function selectTimeSlot(availableTimes) {
+  if (timeClicked) return;
+  timeClicked = true;
+  
+  addLog(`⏰ Found ${availableTimes.length} available time slots!`, '#43e97b');
+  
+  // Select first time
+  const selectedTime = availableTimes[0];
+  addLog(`✅ Selected time: ${selectedTime.textContent}`, '#43e97b');
+  
+  selectedTime.style.backgroundColor = '#10b981';
+  selectedTime.style.color = 'white';
+  selectedTime.style.fontWeight = 'bold';
+  
+  setTimeout(() => {
+    addLog(`👆 Clicking time slot ${selectedTime.textContent}...`, '#43e97b');
+    selectedTime.click();
     
     setTimeout(() => {
-      addLog(`👆 Clicking time slot ${selectedTime.textContent}...`, '#43e97b');
-      selectedTime.click();
-      
-      setTimeout(() => {
-        clickSubmitButton();
-      }, 2000);
-    }, 1000);
-    
-  } else {
-    addLog('⏳ No time slots yet - waiting...', '#95a5a6');
-    setTimeout(findAndSelectTimeSlot, 2000);
-  }
+      clickSubmitButton();
+    }, 2000);
+  }, 1000);
 }
 
 function clickSubmitButton() {
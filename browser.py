@@ -1,10 +1,26 @@
 import base64
+import contextlib
+import datetime as dt
+import hashlib
 import logging
 import os
+import re
+import threading
 import time
-from playwright.sync_api import sync_playwright, Page, TimeoutError as PwTimeout
+from playwright.sync_api import sync_playwright, Browser, Page, TimeoutError as PwTimeout
 
+import browser_watchdog
+import budget
 import config
+import coordination
+import drilldown
+import eventlog
+import flow
+from http_cache import AssetCache
+from notifier import send_booking_result
+from page_monitor import PageMonitor
+from profiles import Profile
+from slots import MONTHS, BookingResult, CalendarSnapshot, Slot, add_months, parse_month, parse_time
 
 log = logging.getLogger(__name__)
 
@@ -47,15 +63,15 @@ def _select_language(page: Page) -> None:
     log.info("Language selected: English")
 
 
-def _select_country(page: Page) -> None:
+def _select_country(page: Page, profile: Profile) -> None:
     """Select the country of residence from the dropdown on the landing page."""
-    log.info("Selecting country: %s", config.COUNTRY_OF_RESIDENCE)
+    log.info("Selecting country: %s", profile.country)
     # The second input.dropdown-toggle is the country selector (appears after language)
     country_input = page.locator("input.dropdown-toggle").nth(1)
     country_input.wait_for(state="visible", timeout=ACTION_TIMEOUT)
     country_input.click()
     time.sleep(1)
-    page.locator("ul.dropdown-menu a", has_text=config.COUNTRY_OF_RESIDENCE).click()
+    page.locator("ul.dropdown-menu a", has_text=profile.country).click()
     # This triggers navigation to /home
     page.wait_for_url("**/home**", timeout=NAVIGATION_TIMEOUT)
     time.sleep(2)
@@ -72,27 +88,33 @@ def _click_book_appointment(page: Page) -> None:
     log.info("Navigated to /schedule")
 
 
-def _fill_credentials(page: Page) -> None:
+def _fill_credentials(page: Page, profile: Profile) -> None:
     """Fill in passport number and visa number on the schedule page."""
     log.info("Filling credentials")
 
     passport_input = page.locator("input[placeholder='Passport Number']")
     passport_input.wait_for(state="visible", timeout=ACTION_TIMEOUT)
-    passport_input.fill(config.PASSPORT_NUMBER)
+    passport_input.fill(profile.passport_number)
     log.debug("Filled passport number")
 
     visa_input = page.locator("input[placeholder='Visa Number']")
     visa_input.wait_for(state="visible", timeout=ACTION_TIMEOUT)
-    visa_input.fill(config.VISA_NUMBER)
+    visa_input.fill(profile.visa_number)
     log.debug("Filled visa number")
 
 
+# ddddocr model, loaded once per process and reused for every captcha
+_ocr = None
+
+
 def _solve_captcha_ocr(image_bytes: bytes) -> str:
     """Try to solve captcha using ddddocr (purpose-built captcha OCR)."""
+    global _ocr
     try:
-        import ddddocr
-        ocr = ddddocr.DdddOcr(show_ad=False)
-        result = ocr.classification(image_bytes)
+        if _ocr is None:
+            import ddddocr
+            _ocr = ddddocr.DdddOcr(show_ad=False)
+        result = _ocr.classification(image_bytes)
         return result.strip()
     except Exception as e:
         log.warning("OCR failed: %s", e)
@@ -117,7 +139,12 @@ def _extract_captcha_image(page: Page) -> bytes:
 
 
 def _refresh_captcha(page: Page) -> None:
-    """Click the captcha refresh button to get a new captcha image."""
+    """Click the captcha refresh button and wait for a new captcha image."""
+    captcha_img = page.locator("#captchaImage")
+    try:
+        before = captcha_img.get_attribute("src", timeout=2_000)
+    except Exception:
+        before = None
     for selector in [
         "#captchaImage + *",         # element right after captcha image
         "img[src*='refresh']",
@@ -131,7 +158,14 @@ def _refresh_captcha(page: Page) -> None:
             btn = page.locator(selector).first
             if btn.is_visible(timeout=2_000):
                 btn.click()
-                time.sleep(2)
+                try:
+                    page.wait_for_function(
+                        "before => { const i = document.querySelector('#captchaImage');"
+                        " return i && i.getAttribute('src') !== before && i.complete; }",
+                        arg=before, timeout=5_000,
+                    )
+                except PwTimeout:
+                    log.debug("Captcha image did not change within 5s")
                 log.info("Refreshed captcha image")
                 return
         except Exception:
@@ -139,8 +173,136 @@ def _refresh_captcha(page: Page) -> None:
     log.warning("Could not find captcha refresh button")
 
 
+# Site requests one captcha retry costs (new image + submit)
+CAPTCHA_ATTEMPT_COST = 2
+
+# How long to wait for the server's verdict on a submitted captcha
+CAPTCHA_VERDICT_TIMEOUT = 15.0  # seconds
+
+# Captcha error wording in the submit response body
+CAPTCHA_REJECTED_RE = re.compile(
+    r"(invalid|incorrect|wrong|enter\s+valid)\s+captcha|captcha\W+(is\s+)?(invalid|incorrect|wrong)",
+    re.IGNORECASE,
+)
+
+# Visible elements whose own text is the captcha error
+_CAPTCHA_ERRORS_JS = r"""
+    const errorRe = /please enter valid captcha/i;
+    const visible = el => !!el && el.isConnected && el.offsetParent !== null;
+    const shownErrors = () => [...document.querySelectorAll("body *")].filter(el =>
+        [...el.childNodes].some(n => n.nodeType === 3 && errorRe.test(n.nodeValue)) && visible(el));
+"""
+
+# Remember the errors shown before a submit, and which of them are hidden or
+# re-rendered afterwards, without touching the page's own DOM
+_ARM_CAPTCHA_VERDICT_JS = r"""() => {""" + _CAPTCHA_ERRORS_JS + r"""
+    if (window.__qvcCaptchaWatch) window.__qvcCaptchaWatch.observer.disconnect();
+    const before = new Set(shownErrors());
+    const changed = new WeakSet();
+    const observer = new MutationObserver(mutations => {
+        for (const el of before) {
+            if (!changed.has(el) && (!visible(el) || mutations.some(m => el.contains(m.target)))) changed.add(el);
+        }
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true, attributes: true});
+    window.__qvcCaptchaWatch = {before, changed, observer};
+}"""
+
+_DISARM_CAPTCHA_VERDICT_JS = r"""() => {
+    const watch = window.__qvcCaptchaWatch;
+    if (watch) watch.observer.disconnect();
+    delete window.__qvcCaptchaWatch;
+}"""
+
+# First decisive DOM state after a submit; an error counts only if it is new or re-shown
+_CAPTCHA_VERDICT_JS = r"""() => {
+    if (!document.body) return null;""" + _CAPTCHA_ERRORS_JS + r"""
+    const watch = window.__qvcCaptchaWatch;  // gone after a navigation: every error is new
+    if (shownErrors().some(el => !watch || !watch.before.has(el) || watch.changed.has(el))) return "rejected";
+    if ([...document.querySelectorAll(".modal")].some(visible)) return "modal";
+    if (!location.pathname.includes("/schedule") || !visible(document.querySelector("#captchaImage")))
+        return "accepted";
+    return null;
+}"""
+
+_SUBMIT_RESOURCE_TYPES = ("xhr", "fetch", "document")
+
+
+def _submit_response_verdict(response) -> str | None:
+    """'rejected' if the submit call itself reports a bad captcha, else None (let the page decide)."""
+    if response.status >= 400:
+        return "rejected"
+    try:
+        body = response.text()
+    except Exception:
+        return None
+    return "rejected" if CAPTCHA_REJECTED_RE.search(body) else None
+
+
+def _captcha_verdict(page: Page, submit_btn) -> str:
+    """Click Submit and return 'accepted' or 'rejected' as soon as either is known.
+
+    The verdict comes from whichever arrives first: a captcha error in the
+    response to the submit request (the first non-GET request after the
+    click), or a decisive change on the page (an error element that is new
+    or was hidden/re-rendered since the click, captcha gone, navigated off
+    /schedule). A modal that pops up meanwhile (e.g. "clear
+    active session") is dismissed and the wait continues.
+    """
+    page.evaluate(_ARM_CAPTCHA_VERDICT_JS)
+    submitted = []
+    responses = []
+
+    def on_request(request):
+        if not submitted and request.method != "GET" and request.resource_type in _SUBMIT_RESOURCE_TYPES:
+            submitted.append(request)
+
+    def on_response(response):
+        if submitted and response.request is submitted[0]:
+            responses.append(response)
+
+    page.on("request", on_request)
+    page.on("response", on_response)
+    try:
+        submit_btn.click(timeout=ACTION_TIMEOUT)
+        clicked_at = time.monotonic()
+        deadline = clicked_at + CAPTCHA_VERDICT_TIMEOUT
+        while time.monotonic() < deadline:
+            if responses:
+                response = responses.pop()
+                if _submit_response_verdict(response) == "rejected":
+                    log.info("Captcha verdict from %s after %.2fs: rejected",
+                             response.url, time.monotonic() - clicked_at)
+                    return "rejected"
+            try:
+                verdict = page.evaluate(_CAPTCHA_VERDICT_JS)
+            except Exception:
+                # Execution context replaced mid-navigation; look again on the new document
+                page.wait_for_timeout(100)
+                continue
+            if verdict == "modal":
+                _dismiss_notification_modal(page, timeout=500)
+                continue
+            if verdict:
+                log.info("Captcha verdict from page after %.2fs: %s",
+                         time.monotonic() - clicked_at, verdict)
+                return verdict
+            page.wait_for_timeout(100)
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("response", on_response)
+        with contextlib.suppress(Exception):
+            page.evaluate(_DISARM_CAPTCHA_VERDICT_JS)
+
+    log.warning("No captcha verdict within %.0fs — treating as rejected", CAPTCHA_VERDICT_TIMEOUT)
+    return "rejected"
+
+
 def _handle_captcha_and_submit(page: Page) -> bool:
-    """Solve captcha with OCR, submit, and retry on failure. Returns True if form was accepted."""
+    """Solve captcha with OCR, submit, and retry on failure. Returns True if form was accepted.
+
+    Raises flow.BudgetExhausted when the request budget cannot pay for a retry.
+    """
     MAX_RETRIES = 5
 
     captcha_img = page.locator("#captchaImage")
@@ -155,6 +317,9 @@ def _handle_captcha_and_submit(page: Page) -> bool:
         return True
 
     for attempt in range(1, MAX_RETRIES + 1):
+        requests = budget.get()
+        if attempt > 1 and requests and requests.wait_time(CAPTCHA_ATTEMPT_COST) > 0:
+            raise flow.BudgetExhausted("no budget left for another captcha attempt this check")
         log.info("Captcha attempt %d/%d", attempt, MAX_RETRIES)
 
         # Extract and solve
@@ -168,57 +333,26 @@ def _handle_captcha_and_submit(page: Page) -> bool:
 
         log.info("OCR solved captcha: %s", answer)
         captcha_input.fill(answer)
-        time.sleep(1)
 
         # Dismiss any modal popup before clicking Submit
-        _dismiss_notification_modal(page, timeout=2_000)
+        if page.evaluate("() => [...document.querySelectorAll('.modal')].some(m => m.offsetParent !== null)"):
+            _dismiss_notification_modal(page, timeout=500)
 
-        # Click Submit
+        # Click Submit (waits for it to be enabled) and read the verdict
         submit_btn = page.locator("button.btn-brand-arrow", has_text="Submit")
         try:
-            submit_btn.wait_for(state="visible", timeout=ACTION_TIMEOUT)
-            for _ in range(30):
-                if not submit_btn.is_disabled():
-                    break
-                time.sleep(1)
-            submit_btn.click()
-            page.wait_for_load_state("networkidle", timeout=NAVIGATION_TIMEOUT)
-            time.sleep(3)
+            verdict = _captcha_verdict(page, submit_btn)
         except Exception as e:
             log.warning("Submit click failed: %s", e)
             # Try dismissing modal that might be blocking
-            _dismiss_notification_modal(page, timeout=3_000)
-            time.sleep(2)
+            _dismiss_notification_modal(page, timeout=1_000)
             continue
 
-        # Dismiss "clear active session" popup if it appears
-        _dismiss_notification_modal(page, timeout=5_000)
-        time.sleep(2)
-
-        # Check if captcha was rejected
-        try:
-            error_el = page.locator("text=Please enter valid Captcha").first
-            if error_el.is_visible(timeout=3_000):
-                log.warning("Captcha rejected — refreshing and retrying")
-                _refresh_captcha(page)
-                captcha_input.fill("")
-                time.sleep(1)
-                continue
-        except (PwTimeout, Exception):
-            pass
-
-        # If still on the same page with captcha visible, it likely failed
-        try:
-            if captcha_img.is_visible(timeout=2_000):
-                # Check if page URL changed (navigated away from schedule)
-                if "/schedule" in page.url:
-                    log.warning("Still on schedule page — captcha likely wrong, retrying")
-                    _refresh_captcha(page)
-                    captcha_input.fill("")
-                    time.sleep(1)
-                    continue
-        except Exception:
-            pass
+        if verdict == "rejected":
+            log.warning("Captcha rejected — refreshing and retrying")
+            captcha_input.fill("")
+            _refresh_captcha(page)
+            continue
 
         log.info("Form submitted successfully")
         return True
@@ -227,8 +361,75 @@ def _handle_captcha_and_submit(page: Page) -> bool:
     return False
 
 
-def _fill_applicant_details(page: Page) -> None:
-    """Fill in mobile number and email on the Applicant Details page, then confirm."""
+# Classify each visible text input as mobile or email, fill empty ones in one pass
+# (native setter + input/change so Angular sees them) and report what each field
+# holds afterwards.
+_FILL_APPLICANT_JS = r"""({mobile, email}) => {
+    const visible = el => el.offsetParent !== null && !el.disabled && !el.readOnly;
+    // "mobile", "email", "both" or null for a piece of text
+    const kindIn = text => {
+        text = (text || "").toLowerCase();
+        const isMobile = /mobile|phone|\btel\b/.test(text), isEmail = /e-?mail/.test(text);
+        if (isMobile && isEmail) return "both";
+        return isMobile ? "mobile" : isEmail ? "email" : null;
+    };
+    const kindOf = inp => {
+        if (inp.type === "email") return "email";
+        if (inp.type === "tel") return "mobile";
+        // The input's own signals first ...
+        const own = [inp.getAttribute("aria-label"), inp.placeholder, inp.name, inp.id,
+                     inp.getAttribute("formcontrolname")];
+        for (const id of (inp.getAttribute("aria-labelledby") || "").split(/\s+/).filter(Boolean)) {
+            const el = document.getElementById(id);
+            if (el) own.push(el.innerText);
+        }
+        if (inp.labels) for (const l of inp.labels) own.push(l.innerText);
+        const kind = kindIn(own.filter(Boolean).join(" "));
+        if (kind) return kind === "both" ? null : kind;
+        // ... then the nearest surrounding text that names exactly one kind
+        const box = inp.closest("div");
+        for (const text of [inp.parentElement && inp.parentElement.innerText,
+                            box && box.previousElementSibling && box.previousElementSibling.innerText]) {
+            const near = kindIn(text);
+            if (near) return near === "both" ? null : near;
+        }
+        return null;
+    };
+    const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, "value").set;
+    const fields = [];
+    const inputs = document.querySelectorAll("input.form-control, input[type='text'], input[type='email'], input[type='tel']");
+    for (const inp of inputs) {
+        if (!visible(inp)) continue;
+        const kind = kindOf(inp);
+        if (!kind) continue;
+        const id = kind + "-" + fields.length;
+        inp.setAttribute("data-applicant-field", id);
+        const wanted = kind === "mobile" ? mobile : email;
+        let filled = false;
+        if (!inp.value) {
+            inp.focus();
+            setter.call(inp, wanted);
+            inp.dispatchEvent(new Event("input", {bubbles: true}));
+            inp.dispatchEvent(new Event("change", {bubbles: true}));
+            inp.dispatchEvent(new Event("blur", {bubbles: true}));
+            filled = true;
+        }
+        fields.push({id, kind, filled, ok: !filled || inp.value === wanted});
+    }
+    return fields;
+}"""
+
+APPLICANT_CONFIRM_SELECTOR = (
+    "button:has-text('I confirm'), button:has-text('confirm that the details'), "
+    "a:has-text('I confirm'), .btn:has-text('confirm')"
+)
+
+
+def _fill_applicant_details(page: Page, profile: Profile) -> None:
+    """Fill in mobile number and email on the Applicant Details page, then confirm.
+
+    Raises flow.StepFailed unless the calendar page is showing afterwards.
+    """
     log.info("Filling applicant details (mobile + email)")
 
     # Wait for the Applicant Details page to load
@@ -237,90 +438,53 @@ def _fill_applicant_details(page: Page) -> None:
             state="visible", timeout=NAVIGATION_TIMEOUT
         )
     except PwTimeout:
-        log.warning("Applicant Details page not detected — skipping")
-        return
-
-    time.sleep(2)
+        raise flow.StepFailed("Applicant Details page not detected")
 
     # Format mobile number: site expects "00" prefix, not "+"
-    mobile = config.MOBILE_NUMBER
+    mobile = profile.mobile_number
     if mobile.startswith("+"):
         mobile = "00" + mobile[1:]
     log.info("Using mobile number: %s", mobile)
 
-    # Find and fill fields by label proximity (Angular forms don't use standard attrs)
-    # Get all visible input fields on the page
-    all_inputs = page.locator("input.form-control, input[type='text'], input[type='email']").all()
-    filled_mobile = 0
-    filled_email = 0
-
-    for inp in all_inputs:
-        try:
-            if not inp.is_visible(timeout=1_000):
-                continue
-            # Check what label is near this input
-            parent = inp.locator("..")
-            parent_text = parent.inner_text(timeout=1_000).strip().lower()
-
-            if "mobile" in parent_text and not inp.input_value(timeout=1_000):
-                inp.fill(mobile)
-                filled_mobile += 1
-                log.info("Filled mobile field #%d", filled_mobile)
-            elif "email" in parent_text and not inp.input_value(timeout=1_000):
-                inp.fill(config.EMAIL_ADDRESS)
-                filled_email += 1
-                log.info("Filled email field #%d", filled_email)
-        except Exception:
-            continue
-
-    # Fallback: try by label text if nothing was filled
-    if filled_mobile == 0:
-        for label in page.locator("label:has-text('Mobile')").all():
-            try:
-                inp = label.locator(".. >> input").first
-                if inp.is_visible(timeout=1_000) and not inp.input_value(timeout=1_000):
-                    inp.fill(mobile)
-                    filled_mobile += 1
-                    log.info("Filled mobile field (by label)")
-            except Exception:
-                continue
+    # Angular forms don't use standard attrs, so fields are found by label text in-page
+    try:
+        page.locator("input.form-control, input[type='text'], input[type='email']").first.wait_for(
+            state="visible", timeout=ACTION_TIMEOUT
+        )
+    except PwTimeout:
+        log.warning("No input fields visible on Applicant Details page")
+    fields = page.evaluate(_FILL_APPLICANT_JS, {"mobile": mobile, "email": profile.email_address})
 
-    if filled_email == 0:
-        for label in page.locator("label:has-text('Email')").all():
+    # Masked or custom inputs that rejected the direct value get a real keyboard fill
+    for f in fields:
+        if not f["ok"]:
+            value = mobile if f["kind"] == "mobile" else profile.email_address
             try:
-                inp = label.locator(".. >> input").first
-                if inp.is_visible(timeout=1_000) and not inp.input_value(timeout=1_000):
-                    inp.fill(config.EMAIL_ADDRESS)
-                    filled_email += 1
-                    log.info("Filled email field (by label)")
-            except Exception:
-                continue
+                page.locator(f"[data-applicant-field='{f['id']}']").fill(value, timeout=2_000)
+            except Exception as e:
+                log.warning("Could not fill %s field: %s", f["kind"], e)
 
+    filled_mobile = sum(1 for f in fields if f["kind"] == "mobile" and f["filled"])
+    filled_email = sum(1 for f in fields if f["kind"] == "email" and f["filled"])
     log.info("Filled %d mobile and %d email fields", filled_mobile, filled_email)
+    if not any(f["kind"] == "mobile" for f in fields) or not any(f["kind"] == "email" for f in fields):
+        log.warning("Mobile or email field not found on Applicant Details page")
 
-    time.sleep(1)
-    page.screenshot(path="logs/applicant_details_filled.png")
-    log.info("Applicant details screenshot saved")
+    if log.isEnabledFor(logging.DEBUG):
+        page.screenshot(path="logs/applicant_details_filled.png")
 
     # Click "I confirm that the details above are accurate..." button
-    for selector in [
-        "button:has-text('I confirm')",
-        "button:has-text('confirm that the details')",
-        "a:has-text('I confirm')",
-        ".btn:has-text('confirm')",
-    ]:
-        try:
-            confirm_btn = page.locator(selector).first
-            if confirm_btn.is_visible(timeout=5_000):
-                confirm_btn.click()
-                log.info("Clicked confirm button")
-                page.wait_for_load_state("networkidle", timeout=NAVIGATION_TIMEOUT)
-                time.sleep(3)
-                return
-        except (PwTimeout, Exception):
-            continue
+    try:
+        page.locator(APPLICANT_CONFIRM_SELECTOR).first.click(timeout=5_000)
+        log.info("Clicked confirm button")
+    except Exception as e:
+        raise flow.StepFailed(f"could not click the confirm button: {e}") from e
 
-    log.warning("Could not find confirm button — continuing anyway")
+    # Return as soon as the calendar page's center dropdown is up
+    try:
+        page.locator("button[name='selectedVsc']").wait_for(state="visible", timeout=NAVIGATION_TIMEOUT)
+    except PwTimeout as e:
+        raise flow.StepFailed("calendar page did not appear after confirming details") from e
 
 
 def _click_submit(page: Page) -> None:
@@ -343,13 +507,13 @@ def _click_submit(page: Page) -> None:
     log.info("Form submitted")
 
 
-def _select_qvc_center(page: Page) -> None:
+def _select_qvc_center(page: Page, location: str) -> bool:
     """Select the QVC Center from the custom dropdown on the calendar page.
 
     The dropdown is: <button name="selectedVsc"> inside <div class="dropdown">,
     with options in <ul class="dropdown-menu"> as <li> items.
     """
-    log.info("Selecting QVC center: %s", config.QVC_LOCATION)
+    log.info("Selecting QVC center: %s", location)
 
     try:
         # Click the dropdown button to reveal the options list
@@ -362,13 +526,13 @@ def _select_qvc_center(page: Page) -> None:
         # Use the <ul> sibling of the button to avoid matching banner text
         option = page.locator(
             "button[name='selectedVsc'] ~ ul.dropdown-menu li",
-            has_text=config.QVC_LOCATION,
+            has_text=location,
         ).first
         option.wait_for(state="visible", timeout=5_000)
         option.click()
         time.sleep(3)
-        log.info("Selected QVC center: %s", config.QVC_LOCATION)
-        return
+        log.info("Selected QVC center: %s", location)
+        return True
     except (PwTimeout, Exception) as e:
         log.warning("Primary dropdown approach failed: %s", e)
 
@@ -376,76 +540,83 @@ def _select_qvc_center(page: Page) -> None:
     try:
         page.locator("button:has-text('Select Center')").first.click()
         time.sleep(1)
-        page.locator("ul.dropdown-menu li", has_text=config.QVC_LOCATION).last.click()
+        page.locator("ul.dropdown-menu li", has_text=location).last.click()
         time.sleep(3)
-        log.info("Selected QVC center (fallback): %s", config.QVC_LOCATION)
-        return
+        log.info("Selected QVC center (fallback): %s", location)
+        return True
     except (PwTimeout, Exception) as e:
         log.warning("Fallback dropdown approach failed: %s", e)
 
     log.warning("Could not find or select QVC center dropdown")
+    return False
 
 
-def _get_calendar_month(page: Page) -> str:
-    """Get the current month/year shown on the calendar."""
-    try:
-        header = page.locator("text=February, text=March, text=April, text=May, text=June, text=July, text=August, text=September, text=October, text=November, text=December, text=January").first
-        return header.inner_text(timeout=2_000).strip()
-    except Exception:
-        return "unknown"
-
+# Available (clickable, non-disabled) date cells
+AVAILABLE_DATE_SELECTORS = [
+    "td.available",
+    "td:not(.disabled):not(.unavailable):not(.off) a",
+    "td.day:not(.disabled):not(.off)",
+    ".day:not(.disabled):not(.off)",
+    "td[class*='available' i]",
+    "a[class*='available' i]",
+]
+
+
+def _date_cell(page: Page, day: int):
+    """Locate the available cell for a day number in the visible month."""
+    return page.locator(
+        ", ".join(AVAILABLE_DATE_SELECTORS),
+        has_text=re.compile(rf"^\s*{day}\s*$"),
+    ).first
+
+
+def _get_calendar_month(page: Page) -> tuple[int, int] | None:
+    """Get the (year, month) currently shown on the calendar, or None if unreadable."""
+    # Look for the month/year header near the calendar navigation
+    for sel in [
+        "th.month",
+        ".datepicker-switch",
+        "button.current",
+        "text=/[A-Za-z]{3,9} \\d{4}/",
+    ]:
+        try:
+            el = page.locator(sel).first
+            if el.is_visible(timeout=2_000):
+                month = parse_month(el.inner_text(timeout=2_000))
+                if month:
+                    return month
+        except Exception:
+            continue
+    return None
 
-def _scrape_month_slots(page: Page) -> list[dict]:
-    """Scrape available dates from the currently visible calendar month."""
-    slots: list[dict] = []
 
-    # Get month header for context
-    month_text = ""
-    try:
-        # Look for the month/year header near the calendar navigation
-        for sel in [
-            "th.month",
-            ".datepicker-switch",
-            "button.current",
-        ]:
-            try:
-                el = page.locator(sel).first
-                if el.is_visible(timeout=2_000):
-                    month_text = el.inner_text(timeout=2_000).strip()
-                    break
-            except Exception:
-                continue
-        if not month_text:
-            # Try broader search for month text near calendar arrows
-            cal_area = page.locator("text=/\\w+ \\d{4}/").first
-            month_text = cal_area.inner_text(timeout=2_000).strip()
-    except Exception:
-        month_text = "current month"
-
-    log.info("Checking calendar: %s", month_text)
-
-    # Look for available (clickable, non-disabled) date cells
-    available_selectors = [
-        "td.available",
-        "td:not(.disabled):not(.unavailable):not(.off) a",
-        "td.day:not(.disabled):not(.off)",
-        ".day:not(.disabled):not(.off)",
-        "td[class*='available' i]",
-        "a[class*='available' i]",
-    ]
+def _scrape_month_slots(
+    page: Page, expected: tuple[int, int], location: str
+) -> tuple[tuple[int, int], list[Slot]]:
+    """Scrape available dates from the currently visible calendar month.
 
-    for selector in available_selectors:
+    `expected` is the month we believe is showing; it is used when the header
+    cannot be read. Returns the month actually scraped and its slots.
+    """
+    month = _get_calendar_month(page)
+    if month is None:
+        log.warning("Could not read calendar header — assuming %04d-%02d", *expected)
+        month = expected
+    year, month_no = month
+    log.info("Checking calendar: %04d-%02d", year, month_no)
+
+    slots: list[Slot] = []
+    for selector in AVAILABLE_DATE_SELECTORS:
         try:
             elements = page.locator(selector).all()
             for el in elements:
                 try:
                     text = el.inner_text(timeout=2_000).strip()
                     if text and text.isdigit():
-                        slots.append({
-                            "date": f"{text} {month_text}",
-                            "time": "",
-                            "location": config.QVC_LOCATION,
-                        })
+                        slots.append(Slot(
+                            date=dt.date(year, month_no, int(text)),
+                            location=location,
+                        ))
                 except Exception:
                     continue
             if slots:
@@ -453,13 +624,350 @@ def _scrape_month_slots(page: Page) -> list[dict]:
         except Exception:
             continue
 
-    return slots
+    return month, slots
+
+
+# Header text and cells of the visible calendar; any availability change alters them
+_CALENDAR_FINGERPRINT_JS = """
+() => {
+  const header = document.querySelector('th.month, .datepicker-switch, button.current');
+  const cells = Array.from(document.querySelectorAll('td'), c => c.className + ':' + c.textContent.trim());
+  return [header ? header.textContent.trim() : '', cells.join('|')];
+}
+"""
+
+NEXT_MONTH_SELECTORS = [
+    "button:has-text('>')",
+    "a:has-text('>')",
+    ".next",
+    "th.next",
+    "button.next",
+    "[aria-label='Next']",
+    ".datepicker .next",
+    ".fa-chevron-right",
+    ".fa-angle-right",
+]
+
+# Month/year <select> pairs offered by some datepicker widgets
+MONTH_SELECT_SELECTORS = [
+    ("select.ui-datepicker-month", "select.ui-datepicker-year"),
+    ("select[aria-label*='month' i]", "select[aria-label*='year' i]"),
+    ("select.monthselect", "select.yearselect"),
+]
+
+# Fingerprint and slots of each (center, month) from earlier scans, reused while unchanged
+_month_cache: dict[tuple[str, tuple[int, int]], tuple[str, list[Slot]]] = {}
+
+# Selector that last moved the calendar forward, tried first next time
+_next_selector: str | None = None
+
+
+def _calendar_state(page: Page) -> tuple[str, tuple[int, int] | None]:
+    """Cheap hash of the visible calendar and the month its header shows; ("", None) if unavailable."""
+    try:
+        header, cells = page.evaluate(_CALENDAR_FINGERPRINT_JS)
+    except Exception:
+        return "", None
+    return hashlib.sha1(f"{header}|{cells}".encode()).hexdigest(), parse_month(header)
+
+
+def _calendar_fingerprint(page: Page) -> str:
+    return _calendar_state(page)[0]
+
+
+def _wait_for_calendar(
+    page: Page, before: str = "", expected: tuple[int, int] | None = None, timeout: float = 3.0
+) -> str:
+    """Poll until the calendar has settled and return its fingerprint ("" on timeout).
+
+    Settled means the fingerprint differs from `before`, the header shows
+    `expected` (when it can be read) and two consecutive reads agree, so a
+    calendar that is still loading is never fingerprinted.
+    """
+    deadline = time.monotonic() + timeout
+    previous = None
+    while True:
+        current, month = _calendar_state(page)
+        if (current and current != before and current == previous
+                and (expected is None or month is None or month == expected)):
+            return current
+        if time.monotonic() >= deadline:
+            log.debug("Calendar did not settle within %.1fs", timeout)
+            return ""
+        previous = current
+        time.sleep(0.1)
+
+
+def _month_option(labels: list[str], month: int) -> int | None:
+    """Index of the option naming `month` ('Jan', 'Jan.', 'January'), or None."""
+    name = list(MONTHS)[month - 1]
+    for index, label in enumerate(labels):
+        label = label.strip().rstrip(".").lower()
+        if len(label) >= 3 and name.startswith(label):
+            return index
+    # Unlabelled but complete month list
+    return month - 1 if len(labels) == 12 else None
+
+
+def _goto_month(page: Page, target: tuple[int, int]) -> bool:
+    """Jump straight to a month via the widget's month/year selects, if it has them.
+
+    Nothing is changed unless both the month and the year option exist. If
+    setting them fails, or the header then shows another month (e.g. the
+    widget clamped to its min/max date), the selects are put back so the
+    next-month arrow can take over from where the calendar was.
+    """
+    year, month = target
+    for month_sel, year_sel in MONTH_SELECT_SELECTORS:
+        try:
+            month_el = page.locator(month_sel).first
+            if not month_el.is_visible(timeout=500):
+                continue
+            month_index = _month_option(month_el.locator("option").all_inner_texts(), month)
+            if month_index is None:
+                continue
+            year_el = page.locator(year_sel).first
+            year_index = None
+            if year_el.is_visible(timeout=500):
+                years = [t.strip() for t in year_el.locator("option").all_inner_texts()]
+                if str(year) not in years:
+                    continue
+                year_index = years.index(str(year))
+
+            original_month = month_el.input_value()
+            original_year = year_el.input_value() if year_index is not None else None
+            try:
+                month_el.select_option(index=month_index)
+                if year_index is not None:
+                    # The widget may re-render its selects after the month changes
+                    page.locator(year_sel).first.select_option(index=year_index)
+                if _shown_month(page) not in (target, None):
+                    raise RuntimeError("calendar did not move to the selected month")
+            except Exception:
+                with contextlib.suppress(Exception):
+                    page.locator(month_sel).first.select_option(value=original_month)
+                    if original_year is not None:
+                        page.locator(year_sel).first.select_option(value=original_year)
+                raise
+            log.info("Jumped to %04d-%02d", year, month)
+            return True
+        except Exception as e:
+            log.debug("Month select %s did not work: %s", month_sel, e)
+            continue
+    return False
+
+
+def _shown_month(page: Page, timeout: float = 2.0) -> tuple[int, int] | None:
+    """Month in the calendar header once it stops changing, or None if unreadable."""
+    deadline = time.monotonic() + timeout
+    previous = _calendar_state(page)
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        current = _calendar_state(page)
+        if current == previous:
+            return current[1]
+        previous = current
+    return previous[1]
+
+
+def _next_month(page: Page) -> bool:
+    """Click the calendar's next-month arrow. Returns False when there is none."""
+    global _next_selector
+
+    selectors = NEXT_MONTH_SELECTORS
+    if _next_selector:
+        selectors = [_next_selector] + [s for s in selectors if s != _next_selector]
+    for selector in selectors:
+        try:
+            btn = page.locator(selector).first
+            if btn.is_visible(timeout=1_000 if selector == _next_selector else 500):
+                if btn.is_disabled() or "disabled" in (btn.get_attribute("class") or ""):
+                    log.info("Next month button is disabled — end of calendar")
+                    return False
+                btn.click()
+                _next_selector = selector
+                log.info("Navigated to next month")
+                return True
+        except Exception:
+            continue
+    log.warning("Could not find next month button — stopping")
+    return False
+
 
+# Booking fast path: no fixed sleeps, each click relies on Playwright's auto-wait
+BOOKING_SUBMIT_SELECTOR = (
+    "button[type='submit'], button:has-text('Submit'), button:has-text('Book'), button:has-text('Confirm')"
+)
+# Wording of a completed booking: a confirmation sentence, or a reference that carries a value
+BOOKING_CONFIRMATION_PATTERN = (
+    r"(appointment|booking)\s+(has\s+been\s+|is\s+|was\s+)?(successfully\s+)?(booked|confirmed|scheduled)"
+    r"|(booking|confirmation|reference)\s+(number|no\.?|code|id)\s*[:#]?\s*(?=[A-Z-]*\d)[A-Z0-9-]{4,}"
+)
+# Confirmation phrases on the page, normalised; with `before`, only those not in it (null if none)
+_CONFIRMATION_TEXT_JS = r"""({pattern, before}) => {
+    if (!document.body) return null;
+    const found = [...new Set((document.body.innerText.match(new RegExp(pattern, "gi")) || [])
+        .map(m => m.replace(/\s+/g, " ").trim()))];
+    if (!before) return found;
+    const fresh = found.filter(m => !before.includes(m));
+    return fresh.length ? fresh : null;
+}"""
+_OFFERED_TIMES_JS = f"() => {{ const t = ({drilldown.DOM_TIMES_JS})(); return t.length ? t : null; }}"
+
+
+def _wants_date(day: dt.date) -> bool:
+    """True if the date lies inside the configured BOOK_DATE_FROM/TO window."""
+    if config.BOOK_DATE_FROM and day < dt.date.fromisoformat(config.BOOK_DATE_FROM):
+        return False
+    if config.BOOK_DATE_TO and day > dt.date.fromisoformat(config.BOOK_DATE_TO):
+        return False
+    return True
+
+
+def _wants_time(t: dt.time) -> bool:
+    """True if the time lies inside the configured BOOK_TIME_FROM/TO window."""
+    if config.BOOK_TIME_FROM and t < dt.time.fromisoformat(config.BOOK_TIME_FROM):
+        return False
+    if config.BOOK_TIME_TO and t > dt.time.fromisoformat(config.BOOK_TIME_TO):
+        return False
+    return True
+
+
+# Booking claims per (process, applicant); connections are not shared across a fork
+_ledgers: dict[tuple[int, str], coordination.BookingLedger] = {}
+
+
+def _ledger(scope: str) -> coordination.BookingLedger:
+    key = (os.getpid(), scope)
+    if key not in _ledgers:
+        _ledgers[key] = coordination.BookingLedger(config.COORDINATION_DB, scope)
+    return _ledgers[key]
+
+
+def _claim_and_book(
+    page: Page, profile: Profile, wanted: list[Slot], detected_at: float
+) -> tuple[BookingResult, bool] | None:
+    """Auto-book the earliest wanted slot no other instance is booking.
+
+    Returns the result and whether it should be reported, or None when every
+    wanted slot is claimed elsewhere or already booked.
+    """
+    ledger = _ledger(profile.name)
+    for slot in sorted(wanted, key=lambda s: s.sort_key):
+        if not ledger.claim(slot):
+            log.info("Auto-booking %s is handled by another instance — skipping", slot)
+            continue
+        result = _auto_book(page, slot, detected_at)
+        try:
+            report = ledger.finish(slot, result.booked)
+        except Exception as e:
+            log.warning("Could not record booking outcome for %s: %s", slot, e)
+            report = True
+        return result, report
+    return None
+
+
+def _report_bookings(bookings: list[tuple[BookingResult, bool]], recipient: str) -> None:
+    for result, report in bookings:
+        if report:
+            send_booking_result(result, recipient)
+        else:
+            log.info("Auto-booking %s failed again — already reported, not emailing", result.slot)
+
+
+def _submit_booking(page: Page, time_el) -> str:
+    """Submit the booking form holding `time_el` and return the confirmation text.
+
+    Only a confirmation phrase that was not on the page before the click
+    counts, and the submit request must not have failed; anything else
+    raises, so a legend or label never passes for a booking.
+    """
+    form = time_el.locator("xpath=ancestor::form[1]")
+    scope = form if form.count() else page
+    submit_btn = scope.locator(BOOKING_SUBMIT_SELECTOR).first
+
+    args = {"pattern": BOOKING_CONFIRMATION_PATTERN, "before": None}
+    args["before"] = page.evaluate(_CONFIRMATION_TEXT_JS, args)
+    submitted = []
+    responses = []
+
+    def on_request(request):
+        if not submitted and request.method != "GET" and request.resource_type in _SUBMIT_RESOURCE_TYPES:
+            submitted.append(request)
+
+    def on_response(response):
+        if submitted and response.request is submitted[0]:
+            responses.append(response)
+
+    page.on("request", on_request)
+    page.on("response", on_response)
+    try:
+        submit_btn.click()
+        try:
+            fresh = page.wait_for_function(_CONFIRMATION_TEXT_JS, arg=args, timeout=NAVIGATION_TIMEOUT)
+        except PwTimeout:
+            status = f" (submit answered {responses[0].status})" if responses else ""
+            raise RuntimeError(f"no booking confirmation appeared after submitting{status}") from None
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("response", on_response)
+    if responses and responses[0].status >= 400:
+        raise RuntimeError(f"booking submit failed with HTTP {responses[0].status}")
+    return "; ".join(fresh.json_value())
+
+
+def _auto_book(page: Page, slot: Slot, detected_at: float) -> BookingResult:
+    """Select the date, pick the earliest preferred time and submit.
+
+    `detected_at` is the time.monotonic() at which the slot was seen, so the
+    returned latency covers the whole claim.
+    """
+    log.info("Auto-booking %s", slot)
+    chosen = slot
+    try:
+        _date_cell(page, slot.date.day).click()
+        offered = page.wait_for_function(_OFFERED_TIMES_JS, timeout=ACTION_TIMEOUT).json_value()
+        candidates = sorted(
+            (t, text) for text in offered
+            if (t := parse_time(text)) is not None and _wants_time(t)
+        )
+        if not candidates:
+            return BookingResult(slot, False, time.monotonic() - detected_at,
+                                 f"No preferred time offered (saw {', '.join(offered)})")
+        slot_time, text = candidates[0]
+        chosen = Slot(slot.date, slot_time, slot.location)
+        time_el = page.get_by_text(text, exact=True).first
+        time_el.click()
+        detail = _submit_booking(page, time_el)
+    except Exception as e:
+        log.warning("Auto-booking %s failed: %s", chosen, e)
+        return BookingResult(chosen, False, time.monotonic() - detected_at, str(e))
 
-def _scrape_calendar(page: Page) -> list[dict]:
-    """Select QVC center, then scrape multiple months of calendar for availability."""
-    all_slots: list[dict] = []
-    MONTHS_TO_CHECK = 3
+    latency = time.monotonic() - detected_at
+    log.info("Booked %s in %.2fs: %s", chosen, latency, detail[:200])
+    try:
+        page.screenshot(path="logs/booking_confirmation.png", full_page=True)
+    except Exception:
+        pass
+    return BookingResult(chosen, True, latency, detail)
+
+
+def _scrape_calendar(
+    page: Page, profile: Profile, bookings: list[tuple[BookingResult, bool]]
+) -> CalendarSnapshot:
+    """Select QVC center, then scrape up to SCAN_MONTHS months of calendar for availability.
+
+    Months whose cells match the fingerprint from an earlier scan reuse the
+    slots found then instead of being scraped again. Auto-booking attempts
+    are appended to `bookings` for the caller to report once the flow ends.
+    """
+    all_slots: list[Slot] = []
+    scanned: set[tuple[int, int]] = set()
+
+    # Drill-down state: the learned time-slot request and times read so far
+    template: drilldown.RequestTemplate | None = None
+    known_times: dict[dt.date, list[dt.time]] = {}
+    learned = not config.DRILL_DOWN_TIMES
 
     # Take initial screenshot
     try:
@@ -480,44 +988,61 @@ def _scrape_calendar(page: Page) -> list[dict]:
             pass
 
     # Select QVC Center from dropdown
-    _select_qvc_center(page)
-
-    # Check current month + next N months
-    for month_idx in range(MONTHS_TO_CHECK):
-        slots = _scrape_month_slots(page)
+    location = profile.qvc_location
+    if not _select_qvc_center(page, location):
+        raise flow.StepFailed(f"could not select QVC center {location}")
+
+    today = dt.date.today()
+    expected = (today.year, today.month)
+    fingerprint = _wait_for_calendar(page)
+    reused = 0
+    for month_idx in range(config.SCAN_MONTHS):
+        cached = next(
+            (key for key, (fp, _) in _month_cache.items()
+             if key[0] == location and fp and fp == fingerprint),
+            None,
+        )
+        if cached:
+            month, slots = cached[1], _month_cache[cached][1]
+            reused += 1
+            log.info("Calendar %04d-%02d unchanged — reusing %d date(s)", *month, len(slots))
+        else:
+            month, slots = _scrape_month_slots(page, expected, location)
+            # Only cache if the calendar did not change while it was being scraped
+            if fingerprint and _calendar_fingerprint(page) == fingerprint:
+                _month_cache[(location, month)] = (fingerprint, slots)
+        detected_at = time.monotonic()
+        scanned.add(month)
         all_slots.extend(slots)
 
         if slots:
-            log.info("Found %d available date(s) in month %d", len(slots), month_idx + 1)
-
-        # Click right arrow (">") to go to next month
-        if month_idx < MONTHS_TO_CHECK - 1:
-            next_clicked = False
-            for selector in [
-                "button:has-text('>')",
-                "a:has-text('>')",
-                ".next",
-                "th.next",
-                "button.next",
-                "[aria-label='Next']",
-                ".datepicker .next",
-                ".fa-chevron-right",
-                ".fa-angle-right",
-            ]:
-                try:
-                    btn = page.locator(selector).first
-                    if btn.is_visible(timeout=3_000):
-                        btn.click()
-                        time.sleep(2)
-                        next_clicked = True
-                        log.info("Navigated to next month")
+            log.info("Found %d available date(s) in %04d-%02d", len(slots), *month)
+            wanted = [s for s in slots if _wants_date(s.date)] if config.AUTO_BOOK else []
+            if wanted and not bookings:
+                # One attempt per check; the page leaves the calendar once submitted
+                attempt = _claim_and_book(page, profile, wanted, detected_at)
+                if attempt:
+                    bookings.append(attempt)
+                    if attempt[0].booked:
                         break
-                except Exception:
-                    continue
+            if not learned:
+                learned = True
+                first = min(slots, key=lambda s: s.date)
+                try:
+                    template, times = drilldown.learn(page, _date_cell(page, first.date.day), first.date)
+                    known_times[first.date] = times
+                except Exception as e:
+                    log.warning("Could not open %s for time slots: %s", first.date_text, e)
 
-            if not next_clicked:
-                log.warning("Could not find next month button — stopping")
-                break
+        # Stop as soon as the horizon is exhausted
+        if month_idx == config.SCAN_MONTHS - 1:
+            break
+        expected = add_months(*month, 1)
+        if not _goto_month(page, expected) and not _next_month(page):
+            break
+        fingerprint = _wait_for_calendar(page, fingerprint, expected)
+
+    log.info("Scanned %d month(s), %d reused from previous scan", len(scanned), reused)
 
     # Take final screenshot
     try:
@@ -525,16 +1050,63 @@ def _scrape_calendar(page: Page) -> list[dict]:
     except Exception:
         pass
 
-    # Deduplicate
-    seen = set()
-    unique: list[dict] = []
-    for s in all_slots:
-        key = s["date"]
-        if key not in seen:
-            seen.add(key)
-            unique.append(s)
+    # Slots are hashable, so the snapshot deduplicates them
+    snapshot = CalendarSnapshot.build(all_slots, scanned)
+    if config.DRILL_DOWN_TIMES and len(snapshot):
+        snapshot = drilldown.fill_times(page, snapshot, template, known_times)
+    return snapshot
 
-    return unique
+
+CHROME_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+CONTEXT_OPTIONS = {
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "viewport": {"width": 1280, "height": 800},
+    # Service workers would fetch the bundles themselves, bypassing the asset cache
+    **({"service_workers": "block"} if config.HTTP_CACHE_DIR else {}),
+}
+
+
+def _attach_asset_cache(context) -> AssetCache | None:
+    """Serve static bundles from HTTP_CACHE_DIR for this context, if enabled."""
+    if not config.HTTP_CACHE_DIR:
+        return None
+    cache = AssetCache(config.HTTP_CACHE_DIR, config.HTTP_CACHE_REVALIDATE_MINUTES * 60)
+    cache.attach(context)
+    return cache
+
+
+@contextlib.contextmanager
+def _budget_tracking(context):
+    """Count this context's site requests against the request budget, if one is set."""
+    requests = budget.get()
+    if requests is None:
+        yield
+        return
+    requests.attach(context)
+    start = requests.spent
+    try:
+        yield
+    finally:
+        spent = requests.spent - start
+        requests.flush()
+        requests.finish_cycle(spent)
+        log.info("Site requests this check: %d", spent)
+
+
+def launch_shared_browser(pw) -> Browser:
+    """Launch a plain browser that several checks can share, one context each.
+
+    Extensions need a persistent context per browser, so EXTENSION_PATH is
+    ignored here.
+    """
+    if config.EXTENSION_PATH:
+        log.info("Shared browser mode — extension not loaded")
+    return pw.chromium.launch(headless=config.HEADLESS, args=CHROME_ARGS)
 
 
 def _launch_browser(pw):
@@ -545,14 +1117,11 @@ def _launch_browser(pw):
 
     Returns (context_or_browser, page, is_persistent).
     """
-    chrome_args = ["--disable-blink-features=AutomationControlled"]
+    chrome_args = list(CHROME_ARGS)
     ext_path = config.EXTENSION_PATH
-
-    ua = (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/124.0.0.0 Safari/537.36"
-    )
+    if ext_path and config.INJECT_MONITOR:
+        log.info("INJECT_MONITOR is on — using the injected monitor instead of the extension")
+        ext_path = ""
 
     if ext_path and os.path.isdir(ext_path):
         # Persistent context is required to load Chrome extensions
@@ -565,8 +1134,7 @@ def _launch_browser(pw):
             user_data_dir="",  # empty string = temp profile
             headless=False,    # extensions don't work in headless mode
             args=chrome_args,
-            user_agent=ua,
-            viewport={"width": 1280, "height": 800},
+            **CONTEXT_OPTIONS,
         )
         # Auto-grant notification permission so the "Allow" bar never appears
         context.grant_permissions(["notifications"])
@@ -580,17 +1148,14 @@ def _launch_browser(pw):
             headless=config.HEADLESS,
             args=chrome_args,
         )
-        context = browser.new_context(
-            user_agent=ua,
-            viewport={"width": 1280, "height": 800},
-        )
+        context = browser.new_context(**CONTEXT_OPTIONS)
         page = context.new_page()
         return browser, page, False
 
 
 def _start_extension_monitor(page: Page) -> None:
     """Trigger the browser extension to start monitoring on the calendar page."""
-    if not config.EXTENSION_PATH or not os.path.isdir(config.EXTENSION_PATH):
+    if not config.EXTENSION_PATH or not os.path.isdir(config.EXTENSION_PATH) or config.INJECT_MONITOR:
         return
     log.info("Triggering extension auto-start on calendar page")
     try:
@@ -601,74 +1166,216 @@ def _start_extension_monitor(page: Page) -> None:
         log.warning("Could not trigger extension auto-start: %s", e)
 
 
-def check_appointments() -> list[dict]:
-    """Run the full booking flow and return available appointment slots."""
-    log.info("Starting appointment check (headless=%s)", config.HEADLESS)
+def check_appointments(
+    profile: Profile | None = None,
+    browser: Browser | None = None,
+    interrupt: threading.Event | None = None,
+) -> CalendarSnapshot | None:
+    """Run the full booking flow and return a snapshot of available slots.
+
+    Checks the .env applicant unless a profile is given. With a shared
+    `browser` the check runs in a fresh context of it, and skips the
+    CALENDAR_WAIT_MINUTES hold so the browser is free for the next applicant.
+    Setting `interrupt` ends the hold early.
+
+    Returns None when the flow failed before the calendar could be read, so
+    callers can tell "no slots" apart from "could not check".
+    """
+    profile = profile or Profile.from_config()
+    log.info("Starting appointment check for %s (headless=%s)", profile.name, config.HEADLESS)
 
-    with sync_playwright() as pw:
-        handle, page, is_persistent = _launch_browser(pw)
-        page.set_default_timeout(ACTION_TIMEOUT)
+    if browser is not None:
+        context = browser.new_context(**CONTEXT_OPTIONS)
+        cache = _attach_asset_cache(context)
+        try:
+            with _budget_tracking(context):
+                return _run_check(context.new_page(), profile, hold=False)
+        finally:
+            if cache:
+                log.info("Asset cache: %s", cache.report())
+            context.close()
 
+    browser_watchdog.reap_orphans()
+    try:
+        with sync_playwright() as pw:
+            handle, page, is_persistent = _launch_browser(pw)
+            cache = _attach_asset_cache(page.context)
+            monitor = None
+            if config.INJECT_MONITOR:
+                monitor = PageMonitor()
+                monitor.install(page.context)
+            try:
+                with _budget_tracking(page.context):
+                    return _run_check(page, profile, hold=True, interrupt=interrupt, monitor=monitor)
+            finally:
+                if cache:
+                    log.info("Asset cache: %s", cache.report())
+                handle.close()
+    finally:
+        # A driver that died mid-check can leave the browser tree behind
+        browser_watchdog.reap_orphans()
+
+
+def _hold_detections(
+    page: Page, monitor: PageMonitor, snapshot: CalendarSnapshot, location: str
+) -> CalendarSnapshot | None:
+    """Snapshot extended with dates the in-page monitor just saw open, or None if none are new."""
+    days = monitor.take_dates()
+    if not days:
+        return None
+    month = _get_calendar_month(page)
+    if month is None:
+        log.warning("In-page monitor saw selectable days %s but the month is unreadable", days)
+        return None
+    known = {s.date for s in snapshot.slots}
+    new = []
+    for day in days:
         try:
-            # Step 1: Navigate to landing page
-            log.info("Navigating to %s", config.BOOKING_URL)
-            page.goto(config.BOOKING_URL, wait_until="networkidle", timeout=NAVIGATION_TIMEOUT)
-            time.sleep(2)
+            date = dt.date(month[0], month[1], day)
+        except ValueError:
+            continue
+        if date not in known:
+            new.append(Slot(date, None, location))
+    if not new:
+        return None
+    log.warning("In-page monitor: %d new date(s) opened: %s", len(new), ", ".join(map(str, new)))
+    return CalendarSnapshot.build(snapshot.slots | set(new), snapshot.months)
+
+
+# Per-state retries; a state that runs out of attempts resumes the flow from its fallback
+BOOKING_FLOW_POLICIES = {
+    "landing": flow.RetryPolicy(attempts=3, backoff=5),
+    "schedule": flow.RetryPolicy(attempts=2, backoff=2, fallback="landing"),
+    # _handle_captcha_and_submit() already retries the captcha itself
+    "captcha": flow.RetryPolicy(attempts=1, fallback="landing"),
+    "applicant_details": flow.RetryPolicy(attempts=2, backoff=2, fallback="landing"),
+    "calendar": flow.RetryPolicy(attempts=3, backoff=2, fallback="landing"),
+}
+
+
+def _landing(page: Page, profile: Profile) -> None:
+    log.info("Navigating to %s", config.BOOKING_URL)
+    page.goto(config.BOOKING_URL, wait_until="networkidle", timeout=NAVIGATION_TIMEOUT)
+    time.sleep(2)
+    _select_language(page)
+    _select_country(page, profile)
+
+
+def _schedule(page: Page, profile: Profile) -> None:
+    if "/schedule" not in page.url:
+        _click_book_appointment(page)
+    _dismiss_notification_modal(page)
+    _fill_credentials(page, profile)
 
-            # Step 2: Select language
-            _select_language(page)
 
-            # Step 3: Select country
-            _select_country(page)
+def _captcha(page: Page) -> None:
+    if not _handle_captcha_and_submit(page):
+        raise flow.StepFailed("captcha not accepted after retries")
 
-            # Step 4: Click "Book Appointment"
-            _click_book_appointment(page)
 
-            # Step 5: Dismiss any notification/attention popup
-            _dismiss_notification_modal(page)
+def _applicant_details(page: Page, profile: Profile) -> None:
+    if page.locator("button[name='selectedVsc']").is_visible():
+        log.info("Already on the calendar page — applicant details done")
+        return
+    _dismiss_notification_modal(page)
+    _fill_applicant_details(page, profile)
+
 
-            # Step 6: Fill passport + visa number
-            _fill_credentials(page)
+def _calendar(page: Page, profile: Profile, bookings: list[tuple[BookingResult, bool]]) -> CalendarSnapshot:
+    _dismiss_notification_modal(page)
+    return _scrape_calendar(page, profile, bookings)
 
-            # Step 7: Handle captcha + submit (with retry)
-            if not _handle_captcha_and_submit(page):
-                log.error("Could not pass captcha after retries")
-                return []
 
-            # Step 8: Fill applicant details (mobile, email) and confirm
-            _dismiss_notification_modal(page)
-            _fill_applicant_details(page)
+def _booking_states(
+    page: Page, profile: Profile, bookings: list[tuple[BookingResult, bool]]
+) -> list[flow.State]:
+    steps = [
+        ("landing", lambda: _landing(page, profile)),
+        ("schedule", lambda: _schedule(page, profile)),
+        ("captcha", lambda: _captcha(page)),
+        ("applicant_details", lambda: _applicant_details(page, profile)),
+        ("calendar", lambda: _calendar(page, profile, bookings)),
+    ]
+    return [flow.State(name, run, BOOKING_FLOW_POLICIES[name]) for name, run in steps]
 
-            # Step 9: Scrape results
-            _dismiss_notification_modal(page)
-            slots = _scrape_calendar(page)
-            log.info("Found %d available slot(s)", len(slots))
 
-            # Step 9.5: Auto-start the browser extension monitor
-            _start_extension_monitor(page)
+def _run_check(
+    page: Page,
+    profile: Profile,
+    hold: bool,
+    interrupt: threading.Event | None = None,
+    monitor: PageMonitor | None = None,
+) -> CalendarSnapshot | None:
+    """Drive one page through the booking flow; see check_appointments()."""
+    page.set_default_timeout(ACTION_TIMEOUT)
 
-            # Step 10: Stay on calendar page for configured duration
-            wait_minutes = config.CALENDAR_WAIT_MINUTES
+    with eventlog.cycle(profile.name) as cycle:
+        try:
+            # Landing → schedule → captcha → applicant details → calendar, resuming on failure
+            bookings: list[tuple[BookingResult, bool]] = []
+            try:
+                results = flow.run(
+                    _booking_states(page, profile, bookings), max_fallbacks=config.FLOW_MAX_RESTARTS
+                )
+            except flow.BudgetExhausted as e:
+                cycle.outcome = "budget"
+                log.warning("Booking flow stopped: %s", e)
+                return None
+            except flow.FlowFailed as e:
+                cycle.outcome = "fail"
+                log.error("Booking flow stopped in %s: %s", e.state, e.cause)
+                with contextlib.suppress(Exception):
+                    page.screenshot(path="logs/error_screenshot.png")
+                return None
+            finally:
+                # Emailed only once the flow is over, so the scan is not held up by SMTP
+                _report_bookings(bookings, profile.recipient_email)
+            snapshot = results["calendar"]
+            log.info("Found %d available slot(s)", len(snapshot))
+
+            # Auto-start the in-page monitor (injected or extension)
+            if monitor:
+                monitor.start(page)
+            else:
+                _start_extension_monitor(page)
+
+            # Stay on calendar page for configured duration
+            wait_minutes = config.CALENDAR_WAIT_MINUTES if hold else 0
             if wait_minutes > 0:
                 log.info("Keeping browser open on calendar page for %d minutes...", wait_minutes)
                 page.screenshot(path="logs/calendar_staying_open.png")
+                interrupt = interrupt or threading.Event()
+                browser_watchdog.check()
                 for remaining in range(wait_minutes * 60, 0, -1):
-                    time.sleep(1)
+                    # Waiting on the page keeps its events (monitor reports) flowing
+                    page.wait_for_timeout(1_000)
+                    if interrupt.is_set():
+                        log.info("Calendar hold interrupted — closing browser")
+                        break
+                    updated = monitor and _hold_detections(page, monitor, snapshot, profile.qvc_location)
+                    if updated:
+                        log.info("Ending calendar hold early to report new dates")
+                        snapshot = updated
+                        break
+                    if remaining % 30 == 0:
+                        reason = browser_watchdog.check()
+                        if reason:
+                            log.warning("Browser over resource limit (%s) — ending hold to recycle it", reason)
+                            break
                     # Log every minute
                     if remaining % 60 == 0:
                         log.info("  %d minute(s) remaining on calendar page", remaining // 60)
-                log.info("Wait complete — closing browser")
+                else:
+                    log.info("Wait complete — closing browser")
 
-            return slots
+            return snapshot
 
         except Exception:
+            cycle.outcome = "error"
             log.error("Error during appointment check", exc_info=True)
             try:
                 page.screenshot(path="logs/error_screenshot.png")
                 log.info("Error screenshot saved to logs/error_screenshot.png")
             except Exception:
                 pass
-            return []
-
-        finally:
-            handle.close()
+            return None
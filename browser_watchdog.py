@@ -0,0 +1,118 @@
+"""Resource watchdog for the Chromium processes this monitor starts.
+
+Samples RSS and CPU of this process's descendants (Playwright driver plus
+browser tree), reports them as a "browser" metric, and says when a limit is
+exceeded so the caller can recycle the browser. Also reaps Chromium
+processes whose Playwright driver died without closing them.
+
+Needs psutil; without it the watchdog is disabled.
+"""
+import logging
+import os
+import time
+
+import config
+import eventlog
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+log = logging.getLogger(__name__)
+
+# Per-process CPU seconds at the previous sample, and when it was taken
+_prev_cpu: dict[int, float] = {}
+_prev_at: float | None = None
+_warned = False
+
+
+def _available() -> bool:
+    global _warned
+    if psutil is None and not _warned:
+        log.warning("psutil not installed — browser watchdog disabled (pip install psutil)")
+        _warned = True
+    return psutil is not None
+
+
+def sample() -> dict | None:
+    """RSS and CPU use of the browser tree since the previous sample, or None without psutil."""
+    global _prev_cpu, _prev_at
+    if not _available():
+        return None
+
+    now = time.monotonic()
+    rss = 0
+    cpu: dict[int, float] = {}
+    for proc in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            with proc.oneshot():
+                rss += proc.memory_info().rss
+                times = proc.cpu_times()
+                cpu[proc.pid] = times.user + times.system
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    used = sum(max(0.0, total - _prev_cpu.get(pid, 0.0)) for pid, total in cpu.items())
+    elapsed = now - _prev_at if _prev_at is not None else None
+    _prev_cpu, _prev_at = cpu, now
+    return {
+        "processes": len(cpu),
+        "rss_mb": round(rss / 1_048_576, 1),
+        # Share of one core since the last sample (may exceed 100 on several cores)
+        "cpu_percent": round(100 * used / elapsed, 1) if elapsed else None,
+    }
+
+
+def check() -> str | None:
+    """Sample, export the numbers, and return why the browser should be recycled (or None)."""
+    stats = sample()
+    if stats is None:
+        return None
+    eventlog.metric("browser", stats)
+
+    if config.BROWSER_MAX_RSS_MB and stats["rss_mb"] > config.BROWSER_MAX_RSS_MB:
+        return f"RSS {stats['rss_mb']:.0f} MB over limit {config.BROWSER_MAX_RSS_MB} MB"
+    cpu = stats["cpu_percent"]
+    if config.BROWSER_MAX_CPU_PERCENT and cpu is not None and cpu > config.BROWSER_MAX_CPU_PERCENT:
+        return f"CPU {cpu:.0f}% over limit {config.BROWSER_MAX_CPU_PERCENT}%"
+    return None
+
+
+def _is_orphan_browser(proc) -> bool:
+    """A Playwright-launched Chromium main process whose driver is gone."""
+    name = proc.name().lower()
+    if "chrom" not in name and "headless_shell" not in name:
+        return False
+    cmdline = proc.cmdline()
+    # Playwright always talks to the browser over a pipe; renderers etc. carry --type=
+    if "--remote-debugging-pipe" not in cmdline or any(a.startswith("--type=") for a in cmdline):
+        return False
+    try:
+        parent = proc.parent()
+    except psutil.NoSuchProcess:
+        return True
+    if parent is None or parent.pid == 1:
+        return True
+    parent_name = parent.name().lower()
+    return "node" not in parent_name and "playwright" not in parent_name and parent.pid != os.getpid()
+
+
+def reap_orphans() -> int:
+    """Kill leftover Playwright Chromium trees from earlier cycles. Returns how many were killed."""
+    if not config.REAP_ORPHAN_BROWSERS or not _available():
+        return 0
+    killed = 0
+    for proc in psutil.process_iter():
+        try:
+            if not _is_orphan_browser(proc):
+                continue
+            tree = proc.children(recursive=True) + [proc]
+            for p in tree:
+                p.kill()
+            psutil.wait_procs(tree, timeout=5)
+            killed += 1
+            log.warning("Killed orphaned Chromium (pid %d, %d process(es))", proc.pid, len(tree))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return killed
@@ -0,0 +1,269 @@
+"""Request budget for the booking site, shared by every monitor on the host.
+
+Requests a check sends to the site (page navigations, form submits, captcha
+fetches and other API calls) are counted per browser context and drawn from
+two token buckets, one per hour and one per day. Counts are kept in memory
+during a check and written with flush() once it ends. The buckets live in
+the coordination database, so they survive restarts and are shared by all
+instances and workers. Schedulers ask wait_time() before starting a check
+and push it back while the budget is short.
+
+Show spend against budget with:  python budget.py [--hours N]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Request
+
+import config
+
+log = logging.getLogger(__name__)
+
+KINDS = ("navigation", "submit", "captcha", "api")
+
+# Estimated requests per check until the first checks have been measured
+DEFAULT_CYCLE_COST = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS budget_bucket (
+    name    TEXT PRIMARY KEY,
+    tokens  REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS budget_spend (
+    hour  INTEGER NOT NULL,  -- unix time // 3600
+    kind  TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, kind)
+);
+CREATE TABLE IF NOT EXISTS budget_meta (
+    key   TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def _site_host(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def classify(request: Request, host: str) -> str | None:
+    """Budget category of a request, or None if it does not count (static assets, other sites)."""
+    request_host = urlsplit(request.url).hostname or ""
+    if not request_host.endswith(host):
+        return None
+    if "captcha" in request.url.lower():
+        return "captcha"
+    if request.is_navigation_request():
+        return "navigation" if request.frame.parent_frame is None else None
+    if request.resource_type in ("xhr", "fetch"):
+        return "submit" if request.method != "GET" else "api"
+    return None
+
+
+class RequestBudget:
+    """Hourly and daily token buckets in SQLite, plus per-hour spend by kind."""
+
+    def __init__(self, path: str, per_hour: int, per_day: int):
+        self.per_hour = per_hour
+        self.per_day = per_day
+        # (capacity, refill per second) for each enabled bucket
+        self._buckets = {
+            name: (float(cap), cap / period)
+            for name, cap, period in (("hour", per_hour, 3600), ("day", per_day, 86400))
+            if cap > 0
+        }
+        self.spent = 0  # requests counted by this process
+        self._pending: dict[str, int] = {}  # counted but not yet written, by kind
+        self._lock = threading.Lock()
+        self._host = _site_host(config.BOOKING_URL)
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._pid = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db.executescript(_SCHEMA)
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # One connection per process: a connection inherited across fork is not safe to use
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    # --- Counting ---
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("request", self._on_request)
+
+    def _on_request(self, request: Request) -> None:
+        kind = classify(request, self._host)
+        if kind:
+            self.record(kind)
+
+    def record(self, kind: str, count: int = 1) -> None:
+        """Count `count` requests of `kind`; they are drawn from the buckets on flush()."""
+        with self._lock:
+            self._pending[kind] = self._pending.get(kind, 0) + count
+            self.spent += count
+
+    def flush(self) -> None:
+        """Draw the counted requests from every bucket (they may go negative) and log the spend."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        total = sum(pending.values())
+        if not total:
+            return
+        now = time.time()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for name, tokens in self._stored_levels(now).items():
+                    self._db.execute(
+                        "INSERT INTO budget_bucket (name, tokens, updated) VALUES (?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                        (name, tokens - total, now),
+                    )
+                self._db.executemany(
+                    "INSERT INTO budget_spend (hour, kind, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT(hour, kind) DO UPDATE SET count = count + excluded.count",
+                    [(int(now // 3600), kind, count) for kind, count in pending.items()],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # Keep the counts for the next flush rather than losing them
+            log.warning("Could not record %d site request(s): %s", total, e)
+            with self._lock:
+                for kind, count in pending.items():
+                    self._pending[kind] = self._pending.get(kind, 0) + count
+
+    # --- Scheduling ---
+
+    def _stored_levels(self, now: float) -> dict[str, float]:
+        """Tokens per bucket in the database after refilling; new buckets start full."""
+        rows = {
+            name: (tokens, updated)
+            for name, tokens, updated in self._db.execute("SELECT name, tokens, updated FROM budget_bucket")
+        }
+        levels = {}
+        for name, (capacity, rate) in self._buckets.items():
+            tokens, updated = rows.get(name, (capacity, now))
+            levels[name] = min(capacity, tokens + max(0.0, now - updated) * rate)
+        return levels
+
+    def _levels(self, now: float) -> dict[str, float]:
+        """Tokens per bucket, less what this process has counted but not flushed yet."""
+        with self._lock:
+            unflushed = sum(self._pending.values())
+        return {name: tokens - unflushed for name, tokens in self._stored_levels(now).items()}
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until every bucket holds `cost` tokens (0 if it can be spent now)."""
+        levels = self._levels(time.time())
+        wait = 0.0
+        for name, (capacity, rate) in self._buckets.items():
+            needed = min(cost, capacity) - levels[name]
+            if needed > 0:
+                wait = max(wait, needed / rate)
+        return wait
+
+    def cycle_cost(self) -> float:
+        row = self._db.execute("SELECT value FROM budget_meta WHERE key = 'cycle_cost'").fetchone()
+        return row[0] if row else DEFAULT_CYCLE_COST
+
+    def finish_cycle(self, spent: int) -> None:
+        """Fold one check's request count into the moving average used for scheduling."""
+        cost = 0.8 * self.cycle_cost() + 0.2 * spent
+        self._db.execute(
+            "INSERT INTO budget_meta (key, value) VALUES ('cycle_cost', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (cost,),
+        )
+
+    def status(self) -> dict:
+        levels = self._levels(time.time())
+        return {
+            **{f"tokens_{name}": round(tokens, 1) for name, tokens in levels.items()},
+            "cycle_cost": round(self.cycle_cost(), 1),
+            "spent": self.spent,
+        }
+
+    # --- Reporting ---
+
+    def report(self, hours: float = 24) -> str:
+        since = int((time.time() - hours * 3600) // 3600)
+        rows = self._db.execute(
+            "SELECT hour, kind, count FROM budget_spend WHERE hour >= ? ORDER BY hour", (since,)
+        ).fetchall()
+        per_hour: dict[int, dict[str, int]] = {}
+        for hour, kind, count in rows:
+            per_hour.setdefault(hour, {})[kind] = count
+
+        lines = [f"{'hour':<18}" + "".join(f"{k:>12}" for k in KINDS) + f"{'total':>8}{'budget':>8}"]
+        totals = dict.fromkeys(KINDS, 0)
+        for hour, counts in sorted(per_hour.items()):
+            label = time.strftime("%Y-%m-%d %H:00", time.localtime(hour * 3600))
+            total = sum(counts.values())
+            for k in KINDS:
+                totals[k] += counts.get(k, 0)
+            budget = str(self.per_hour) if self.per_hour else "-"
+            flag = " !" if self.per_hour and total > self.per_hour else ""
+            lines.append(
+                f"{label:<18}" + "".join(f"{counts.get(k, 0):>12}" for k in KINDS)
+                + f"{total:>8}{budget:>8}{flag}"
+            )
+        total = sum(totals.values())
+        budget = f"{self.per_day * hours / 24:.0f}" if self.per_day else "-"
+        lines.append(f"{'total':<18}" + "".join(f"{totals[k]:>12}" for k in KINDS) + f"{total:>8}{budget:>8}")
+        left = ", ".join(
+            f"{name} {tokens:.0f}/{self._buckets[name][0]:.0f}"
+            for name, tokens in self._levels(time.time()).items()
+        )
+        lines.append(f"Tokens left: {left or 'no limit'} | a check costs ~{self.cycle_cost():.0f} request(s)")
+        return "\n".join(lines)
+
+
+_budget: RequestBudget | None = None
+_budget_pid = 0
+
+
+def get() -> RequestBudget | None:
+    """This process's budget, or None when no limit is configured.
+
+    A budget inherited from the parent of a forked worker is replaced, so the
+    worker neither shares its connection nor re-flushes its unwritten counts.
+    """
+    global _budget, _budget_pid
+    if _budget is not None and _budget_pid != os.getpid():
+        _budget = None
+    if _budget is None and (config.REQUEST_BUDGET_PER_HOUR or config.REQUEST_BUDGET_PER_DAY):
+        _budget = RequestBudget(
+            config.COORDINATION_DB, config.REQUEST_BUDGET_PER_HOUR, config.REQUEST_BUDGET_PER_DAY
+        )
+        _budget_pid = os.getpid()
+    return _budget
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show request spend against the site budget")
+    parser.add_argument("--hours", type=float, default=24, help="how far back to report (default: 24)")
+    args = parser.parse_args()
+    budget = RequestBudget(
+        config.COORDINATION_DB, config.REQUEST_BUDGET_PER_HOUR, config.REQUEST_BUDGET_PER_DAY
+    )
+    print(budget.report(args.hours))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import datetime as dt
 import os
 import sys
 from dotenv import load_dotenv
@@ -20,6 +21,10 @@ VISA_NUMBER = _get("VISA_NUMBER")
 MOBILE_NUMBER = _get("MOBILE_NUMBER")
 EMAIL_ADDRESS = _get("EMAIL_ADDRESS")
 
+# Multi-applicant mode: JSON/YAML file of applicant profiles (overrides the above)
+PROFILES_FILE = _get("PROFILES_FILE", "")
+WORKERS = max(1, int(_get("WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))))
+
 # SMTP
 SMTP_HOST = _get("SMTP_HOST", "smtp.gmail.com")
 SMTP_PORT = int(_get("SMTP_PORT", "587"))
@@ -35,24 +40,95 @@ LOG_LEVEL = _get("LOG_LEVEL", "INFO").upper()
 # Browser extension (path to unpacked extension folder)
 EXTENSION_PATH = _get("EXTENSION_PATH", "")
 
+# Inject the extension's detection/keepalive logic instead of loading the extension (works headless)
+INJECT_MONITOR = _get("INJECT_MONITOR", "false").lower() in ("true", "1", "yes")
+
+# Browser resource watchdog (needs psutil): recycle the browser over these limits, 0 disables
+BROWSER_MAX_RSS_MB = int(_get("BROWSER_MAX_RSS_MB", "1500"))
+BROWSER_MAX_CPU_PERCENT = int(_get("BROWSER_MAX_CPU_PERCENT", "0"))
+REAP_ORPHAN_BROWSERS = _get("REAP_ORPHAN_BROWSERS", "true").lower() in ("true", "1", "yes")
+
+# On-disk cache for the site's static bundles (empty disables it)
+HTTP_CACHE_DIR = _get("HTTP_CACHE_DIR", "logs/http_cache")
+HTTP_CACHE_REVALIDATE_MINUTES = int(_get("HTTP_CACHE_REVALIDATE_MINUTES", "60"))
+
+# Times per check the booking flow may restart from the landing page after a step keeps failing
+FLOW_MAX_RESTARTS = int(_get("FLOW_MAX_RESTARTS", "1"))
+
+# Number of calendar months to scan, starting with the current one
+SCAN_MONTHS = max(1, int(_get("SCAN_MONTHS", "3")))
+
+# Time-slot drill-down for each available date
+DRILL_DOWN_TIMES = _get("DRILL_DOWN_TIMES", "true").lower() in ("true", "1", "yes")
+DRILL_DOWN_CONCURRENCY = int(_get("DRILL_DOWN_CONCURRENCY", "4"))
+DRILL_DOWN_TIMEOUT = int(_get("DRILL_DOWN_TIMEOUT", "5"))  # seconds
+
+# Auto-booking (opt-in): claim the first slot inside these windows as soon as it is seen.
+# Empty bounds mean "no limit".
+AUTO_BOOK = _get("AUTO_BOOK", "false").lower() in ("true", "1", "yes")
+BOOK_DATE_FROM = _get("BOOK_DATE_FROM")  # YYYY-MM-DD
+BOOK_DATE_TO = _get("BOOK_DATE_TO")      # YYYY-MM-DD
+BOOK_TIME_FROM = _get("BOOK_TIME_FROM")  # HH:MM
+BOOK_TIME_TO = _get("BOOK_TIME_TO")      # HH:MM
+
+# Localhost control interface port (0 disables it)
+CONTROL_PORT = int(_get("CONTROL_PORT", "8765"))
+
+# Requests to the booking site allowed per hour / per day across all instances (0 = no limit)
+REQUEST_BUDGET_PER_HOUR = int(_get("REQUEST_BUDGET_PER_HOUR", "300"))
+REQUEST_BUDGET_PER_DAY = int(_get("REQUEST_BUDGET_PER_DAY", "5000"))
+
+# SQLite file shared by monitor instances on this host (schedule, alerts, snapshot)
+COORDINATION_DB = _get("COORDINATION_DB", "logs/coordination.db")
+
 # How long to keep the browser open on the calendar page (minutes)
 CALENDAR_WAIT_MINUTES = int(_get("CALENDAR_WAIT_MINUTES", "10"))
 
 # Required fields validation
 _REQUIRED = {
+    "SMTP_USER": SMTP_USER,
+    "SMTP_PASSWORD": SMTP_PASSWORD,
+}
+
+# Required unless PROFILES_FILE supplies the applicants
+_REQUIRED_APPLICANT = {
     "PASSPORT_NUMBER": PASSPORT_NUMBER,
     "VISA_NUMBER": VISA_NUMBER,
     "MOBILE_NUMBER": MOBILE_NUMBER,
     "EMAIL_ADDRESS": EMAIL_ADDRESS,
-    "SMTP_USER": SMTP_USER,
-    "SMTP_PASSWORD": SMTP_PASSWORD,
     "RECIPIENT_EMAIL": RECIPIENT_EMAIL,
 }
 
 
 def validate() -> None:
-    missing = [k for k, v in _REQUIRED.items() if not v]
+    required = dict(_REQUIRED)
+    if PROFILES_FILE:
+        if not os.path.isfile(PROFILES_FILE):
+            print(f"ERROR: PROFILES_FILE not found: {PROFILES_FILE}")
+            sys.exit(1)
+    else:
+        required.update(_REQUIRED_APPLICANT)
+    missing = [k for k, v in required.items() if not v]
     if missing:
         print(f"ERROR: Missing required .env values: {', '.join(missing)}")
         print("Copy .env.example to .env and fill in all required fields.")
         sys.exit(1)
+
+    if AUTO_BOOK:
+        checks = [
+            ("BOOK_DATE_FROM", BOOK_DATE_FROM, dt.date.fromisoformat),
+            ("BOOK_DATE_TO", BOOK_DATE_TO, dt.date.fromisoformat),
+            ("BOOK_TIME_FROM", BOOK_TIME_FROM, dt.time.fromisoformat),
+            ("BOOK_TIME_TO", BOOK_TIME_TO, dt.time.fromisoformat),
+        ]
+        invalid = []
+        for key, value, parse in checks:
+            try:
+                if value:
+                    parse(value)
+            except ValueError:
+                invalid.append(key)
+        if invalid:
+            print(f"ERROR: Invalid .env values: {', '.join(invalid)}")
+            print("Dates must be YYYY-MM-DD and times HH:MM.")
+            sys.exit(1)
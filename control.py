@@ -0,0 +1,156 @@
+"""Localhost HTTP control interface for a running monitor.
+
+    curl localhost:8765/status              live status as JSON
+    curl -X POST localhost:8765/check       run a check now
+    curl -X POST localhost:8765/pause       stop scheduled checks
+    curl -X POST localhost:8765/resume      resume scheduled checks
+    curl -X POST 'localhost:8765/interval?minutes=5'
+"""
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import eventlog
+
+log = logging.getLogger(__name__)
+
+
+class Controller:
+    """Operator requests shared between the HTTP thread and the monitor loop."""
+
+    def __init__(self, interval_minutes: int):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # Set to cut the calendar hold short (check requested or shutting down)
+        self.interrupt = threading.Event()
+        self._check_requested = False
+        self._new_interval: int | None = None
+        self.paused = False
+        self.interval_minutes = interval_minutes
+        self.started_at = time.time()
+        self.cycles = 0
+        self.last_check_at: float | None = None
+        self.next_check_at: float | None = None
+        self.last_slots: list[str] = []
+        self.extra: dict = {}
+
+    # --- Called from the HTTP thread ---
+
+    def request_check(self) -> None:
+        with self._lock:
+            self._check_requested = True
+        self._wake.set()
+        self.interrupt.set()
+
+    def set_paused(self, paused: bool) -> None:
+        self.paused = paused
+        self._wake.set()
+
+    def set_interval(self, minutes: int) -> None:
+        if minutes < 1:
+            raise ValueError("interval must be at least 1 minute")
+        with self._lock:
+            self._new_interval = minutes
+            self.interval_minutes = minutes
+        self._wake.set()
+
+    def status(self) -> dict:
+        now = time.time()
+        with self._lock:
+            status = {
+                "state": "paused" if self.paused else "running",
+                "interval_minutes": self.interval_minutes,
+                "uptime_s": round(now - self.started_at),
+                "cycles": self.cycles,
+                "check_requested": self._check_requested,
+                "last_check_at": self.last_check_at,
+                "next_check_in_s": round(self.next_check_at - now) if self.next_check_at else None,
+                "last_slots": list(self.last_slots),
+                **self.extra,
+            }
+        status.update(eventlog.live_status())
+        return status
+
+    # --- Called from the monitor loop ---
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def wait(self, timeout: float) -> None:
+        """Sleep up to `timeout` seconds, returning early on any operator action."""
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def take_check_request(self) -> bool:
+        with self._lock:
+            requested, self._check_requested = self._check_requested, False
+        return requested
+
+    def take_interval_change(self) -> int | None:
+        with self._lock:
+            minutes, self._new_interval = self._new_interval, None
+        return minutes
+
+    def record_cycle(self, slots: list[str]) -> None:
+        with self._lock:
+            self.cycles += 1
+            self.last_check_at = time.time()
+            self.last_slots = slots
+
+
+def _handler(controller: Controller):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code: int, body: dict) -> None:
+            data = json.dumps(body, indent=2, default=str).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if urlsplit(self.path).path == "/status":
+                self._reply(200, controller.status())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            try:
+                if url.path == "/check":
+                    controller.request_check()
+                elif url.path == "/pause":
+                    controller.set_paused(True)
+                elif url.path == "/resume":
+                    controller.set_paused(False)
+                elif url.path == "/interval":
+                    minutes = parse_qs(url.query).get("minutes", [""])[0]
+                    controller.set_interval(int(minutes))
+                else:
+                    self._reply(404, {"error": "not found"})
+                    return
+            except ValueError as e:
+                self._reply(400, {"error": str(e)})
+                return
+            log.info("Control request: %s", self.path)
+            self._reply(200, {"ok": True, "status": controller.status()})
+
+        def log_message(self, format, *args):
+            log.debug("control: " + format, *args)
+
+    return Handler
+
+
+def serve(controller: Controller, port: int) -> ThreadingHTTPServer | None:
+    """Start the control server on 127.0.0.1 in a daemon thread. Returns None if the port is taken."""
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _handler(controller))
+    except OSError as e:
+        log.warning("Control interface not started on port %d: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="control", daemon=True).start()
+    log.info("Control interface listening on http://127.0.0.1:%d", port)
+    return server
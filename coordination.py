@@ -0,0 +1,271 @@
+import json
+import logging
+import math
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from slots import CalendarSnapshot, Slot
+
+log = logging.getLogger(__name__)
+
+# A claimed-but-unsent alert is given up after this long (sender presumed dead)
+CLAIM_TIMEOUT = 300  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    scope     TEXT NOT NULL,
+    id        TEXT NOT NULL,
+    pid       INTEGER NOT NULL,
+    started   REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    PRIMARY KEY (scope, id)
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    scope      TEXT NOT NULL,
+    slot       TEXT NOT NULL,
+    instance   TEXT NOT NULL,
+    status     TEXT NOT NULL,  -- 'pending' while sending, then 'sent'
+    claimed_at REAL NOT NULL,
+    PRIMARY KEY (scope, slot)
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    scope      TEXT NOT NULL,
+    slot       TEXT NOT NULL,
+    instance   TEXT NOT NULL,
+    status     TEXT NOT NULL,  -- 'pending' while booking, then 'booked' or 'failed'
+    claimed_at REAL NOT NULL,
+    failures   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, slot)
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    scope    TEXT PRIMARY KEY,
+    instance TEXT NOT NULL,
+    data     TEXT NOT NULL
+);
+"""
+
+
+class Coordinator:
+    """Shares work between monitor processes through one SQLite file.
+
+    Each live instance registers a heartbeat. Instances poll at staggered
+    phases of the check interval, share the latest calendar snapshot, and
+    claim each alert in a transaction so exactly one of them sends it.
+
+    All state is partitioned by `scope` (the applicant profile name), and
+    `offset` shifts this scope's whole schedule within the interval.
+    """
+
+    def __init__(
+        self, path: str, interval: float, stale_after: float,
+        scope: str = "default", offset: float = 0.0,
+    ):
+        self.path = path
+        self.interval = interval
+        self.stale_after = stale_after
+        self.scope = scope
+        self.offset = offset
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.started = time.time()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self.heartbeat()
+        log.info("Coordinator %s (%s) using %s", self.id, scope, path)
+
+    def close(self) -> None:
+        """Deregister this instance so the others re-balance their phases."""
+        try:
+            self._db.execute(
+                "DELETE FROM instances WHERE scope = ? AND id = ?", (self.scope, self.id)
+            )
+        finally:
+            self._db.close()
+
+    # --- Membership and scheduling ---
+
+    def heartbeat(self) -> None:
+        self._db.execute(
+            "INSERT INTO instances (scope, id, pid, started, heartbeat) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(scope, id) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (self.scope, self.id, os.getpid(), self.started, time.time()),
+        )
+
+    def peers(self) -> list[str]:
+        """IDs of live instances (including this one), oldest first."""
+        cutoff = time.time() - self.stale_after
+        self._db.execute("DELETE FROM instances WHERE heartbeat < ?", (cutoff,))
+        rows = self._db.execute(
+            "SELECT id FROM instances WHERE scope = ? ORDER BY started, id", (self.scope,)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def next_run_at(self, now: float | None = None) -> float:
+        """Wall-clock time of this instance's next check.
+
+        With N live instances, instance k polls at phase k/N of the interval,
+        so together they check N times per interval instead of in lockstep.
+        """
+        now = time.time() if now is None else now
+        peers = self.peers()
+        rank = peers.index(self.id) if self.id in peers else 0
+        phase = (self.offset + self.interval * rank / max(len(peers), 1)) % self.interval
+        cycles = math.floor((now - phase) / self.interval) + 1
+        return cycles * self.interval + phase
+
+    # --- Shared snapshot ---
+
+    def last_snapshot(self) -> CalendarSnapshot | None:
+        row = self._db.execute(
+            "SELECT data FROM snapshot WHERE scope = ?", (self.scope,)
+        ).fetchone()
+        return CalendarSnapshot.from_dict(json.loads(row[0])) if row else None
+
+    def publish_snapshot(self, snapshot: CalendarSnapshot) -> CalendarSnapshot | None:
+        """Store the snapshot and return the one it replaced, atomically."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            previous = self.last_snapshot()
+            if previous is not None and previous.taken_at > snapshot.taken_at:
+                # A peer published a newer pass meanwhile; keep theirs
+                self._db.execute("COMMIT")
+                return previous
+            self._db.execute(
+                "INSERT INTO snapshot (scope, instance, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(scope) DO UPDATE SET instance = excluded.instance, data = excluded.data",
+                (self.scope, self.id, json.dumps(snapshot.to_dict())),
+            )
+            self._db.execute("COMMIT")
+            return previous
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    # --- Alert election ---
+
+    def claim(self, slots: list[Slot]) -> list[Slot]:
+        """Claim the right to alert for these slots; returns those won by this instance."""
+        won: list[Slot] = []
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute(
+                "DELETE FROM alerts WHERE scope = ? AND status = 'pending' AND claimed_at < ?",
+                (self.scope, time.time() - CLAIM_TIMEOUT),
+            )
+            for s in slots:
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO alerts (scope, slot, instance, status, claimed_at) "
+                    "VALUES (?, ?, ?, 'pending', ?)",
+                    (self.scope, s.key, self.id, time.time()),
+                )
+                if cur.rowcount:
+                    won.append(s)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return won
+
+    def mark_sent(self, slots: list[Slot]) -> None:
+        self._db.executemany(
+            "UPDATE alerts SET status = 'sent' WHERE scope = ? AND slot = ? AND instance = ?",
+            [(self.scope, s.key, self.id) for s in slots],
+        )
+
+    def release(self, slots: list[Slot]) -> None:
+        """Give up claims after a failed send so any instance can retry."""
+        self._db.executemany(
+            "DELETE FROM alerts WHERE scope = ? AND slot = ? AND instance = ?",
+            [(self.scope, s.key, self.id) for s in slots],
+        )
+
+    def forget(self, slots) -> None:
+        """Drop alert records for closed slots so a re-opened slot alerts again.
+
+        A timed slot also drops its day's date-only record, and a closed
+        date-only slot (the whole day gone) drops every record for that day,
+        since already_notified() matches those keys against each other.
+        """
+        slots = list(slots)
+        closed_days = {s.day for s in slots if s.time is None}
+        keys = {s.key for s in slots} | {Slot(s.date, None, s.location).key for s in slots}
+        if closed_days:
+            keys |= {k for k in self.notified() if Slot.from_key(k).day in closed_days}
+        self._db.executemany(
+            "DELETE FROM alerts WHERE scope = ? AND slot = ?", [(self.scope, k) for k in keys]
+        )
+        # Bookings are claimed per day; a failed one is reported again if the day re-opens
+        self._db.executemany(
+            "DELETE FROM bookings WHERE scope = ? AND slot = ? AND status = 'failed'",
+            [(self.scope, Slot(s.date, None, s.location).key) for s in slots],
+        )
+
+    def notified(self) -> set[str]:
+        rows = self._db.execute(
+            "SELECT slot FROM alerts WHERE scope = ?", (self.scope,)
+        ).fetchall()
+        return {r[0] for r in rows}
+
+
+class BookingLedger:
+    """Elects the one instance that may auto-book a slot and records the outcome.
+
+    Shares the coordination database with Coordinator but does not register
+    as an instance, so checks running in pool workers can use it too.
+    """
+
+    def __init__(self, path: str, scope: str = "default"):
+        self.scope = scope
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def claim(self, slot: Slot) -> bool:
+        """True if this instance may try to book `slot`.
+
+        A slot is never re-booked once booked, and is only retried after a
+        failure; a pending claim is given up after CLAIM_TIMEOUT.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            cur = self._db.execute(
+                "INSERT INTO bookings (scope, slot, instance, status, claimed_at) "
+                "VALUES (?, ?, ?, 'pending', ?) "
+                "ON CONFLICT(scope, slot) DO UPDATE SET "
+                "instance = excluded.instance, status = 'pending', claimed_at = excluded.claimed_at "
+                "WHERE status = 'failed' OR (status = 'pending' AND claimed_at < ?)",
+                (self.scope, slot.key, self.id, time.time(), time.time() - CLAIM_TIMEOUT),
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return cur.rowcount > 0
+
+    def finish(self, slot: Slot, booked: bool) -> bool:
+        """Record the outcome of a claimed attempt; True if it should be reported.
+
+        Every booking is reported, a failure only the first time for the slot.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute(
+                "UPDATE bookings SET status = ?, failures = failures + ? "
+                "WHERE scope = ? AND slot = ? AND instance = ?",
+                ("booked" if booked else "failed", 0 if booked else 1, self.scope, slot.key, self.id),
+            )
+            row = self._db.execute(
+                "SELECT failures FROM bookings WHERE scope = ? AND slot = ?", (self.scope, slot.key)
+            ).fetchone()
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return booked or (row is not None and row[0] <= 1)
@@ -0,0 +1,232 @@
+"""Time-slot drill-down: find the offered times for every available date.
+
+One date is clicked to discover the request that loads its time slots; that
+request is then replayed for all other dates concurrently from inside the page.
+"""
+import datetime as dt
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from urllib.parse import quote
+
+from playwright.sync_api import Locator, Page, Response
+
+import config
+from slots import CalendarSnapshot, Slot, parse_time
+
+log = logging.getLogger(__name__)
+
+# Formats the site might use for a date inside a URL or request body
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y"]
+
+_TIME_IN_TEXT_RE = re.compile(r"\b(\d{1,2}:\d{2})(?::\d{2})?\s*([AaPp][Mm])?\b")
+
+# Strings with a date part are timestamps (ISO dates, server/created times), not slot times
+_DATE_PART_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}")
+
+# Flags that mark a slot entry as not bookable: false for the first set, true for the second
+_AVAILABLE_FLAGS = {"available", "isavailable", "enabled", "isenabled", "bookable", "selectable", "active"}
+_UNAVAILABLE_FLAGS = {"disabled", "isdisabled", "unavailable", "booked", "isbooked", "full", "isfull", "blocked"}
+
+# Replays a list of requests in the page with bounded concurrency
+_FETCH_ALL_JS = """
+async ({requests, concurrency}) => {
+  const out = new Array(requests.length).fill(null);
+  let next = 0;
+  async function worker() {
+    while (next < requests.length) {
+      const i = next++;
+      const r = requests[i];
+      try {
+        const resp = await fetch(r.url, {
+          method: r.method, headers: r.headers, body: r.body, credentials: 'include'
+        });
+        if (resp.ok) out[i] = await resp.text();
+      } catch (e) {}
+    }
+  }
+  await Promise.all(Array.from({length: Math.min(concurrency, requests.length)}, worker));
+  return out;
+}
+"""
+
+# Same rule as the extension's findAndSelectTimeSlot(), but in one evaluation
+DOM_TIMES_JS = """
+() => Array.from(document.querySelectorAll('button, div, span, li, a, label'))
+  .filter(el => /^\\d{1,2}:\\d{2}(\\s*[AaPp][Mm])?$/.test(el.textContent.trim()))
+  .filter(el => !el.classList.contains('unavailable') && !el.classList.contains('disabled') && !el.disabled)
+  .map(el => el.textContent.trim())
+"""
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    """A captured time-slot request with the date's position marked."""
+
+    url: str
+    method: str
+    headers: dict
+    body: str | None
+    date_format: str
+    date_text: str
+
+    def for_date(self, day: dt.date) -> dict:
+        """Build the request payload for another date."""
+        new = day.strftime(self.date_format)
+        old_q, new_q = quote(self.date_text, safe=""), quote(new, safe="")
+
+        def swap(s: str | None) -> str | None:
+            if s is None:
+                return None
+            return s.replace(self.date_text, new).replace(old_q, new_q)
+
+        return {"url": swap(self.url), "method": self.method,
+                "headers": self.headers, "body": swap(self.body)}
+
+
+def _falsy(value) -> bool:
+    return value in (False, 0, None) or (isinstance(value, str) and value.strip().lower() in ("false", "0", "no", ""))
+
+
+def _offered(entry: dict) -> bool:
+    """False if the entry carries an availability flag saying it cannot be booked."""
+    for key, value in entry.items():
+        key = key.lower().replace("_", "")
+        if key in _AVAILABLE_FLAGS and _falsy(value):
+            return False
+        if key in _UNAVAILABLE_FLAGS and not _falsy(value):
+            return False
+    return True
+
+
+def times_in(payload) -> list[dt.time]:
+    """Collect the offered times of day in a decoded JSON payload.
+
+    Strings with a date part (timestamps) are ignored, as are entries
+    flagged unavailable/disabled/booked next to their time.
+    """
+    found: set[dt.time] = set()
+    stack = [payload]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if _offered(item):
+                stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str) and not _DATE_PART_RE.search(item):
+            for hm, meridiem in _TIME_IN_TEXT_RE.findall(item):
+                t = parse_time(f"{hm} {meridiem}".strip())
+                if t:
+                    found.add(t)
+    return sorted(found)
+
+
+def _decode(text: str | None):
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _make_template(response: Response, day: dt.date) -> RequestTemplate | None:
+    """Return a template if the response's request mentions the clicked date."""
+    request = response.request
+    url, body = request.url, request.post_data
+    haystack = url + "\n" + (body or "")
+    for fmt in DATE_FORMATS:
+        text = day.strftime(fmt)
+        if text in haystack or quote(text, safe="") in haystack:
+            headers = {k: v for k, v in request.headers.items() if not k.startswith(":")}
+            return RequestTemplate(url, request.method, headers, body, fmt, text)
+    return None
+
+
+def learn(page: Page, cell: Locator, day: dt.date) -> tuple[RequestTemplate | None, list[dt.time]]:
+    """Click one date cell and find the request that loads its time slots.
+
+    Returns the request template (None if no matching API call was seen)
+    and the times shown for the clicked date.
+    """
+    responses: list[Response] = []
+
+    def collect(resp: Response) -> None:
+        if resp.request.resource_type in ("xhr", "fetch"):
+            responses.append(resp)
+
+    page.on("response", collect)
+    try:
+        cell.click()
+        try:
+            page.wait_for_load_state("networkidle", timeout=config.DRILL_DOWN_TIMEOUT * 1000)
+        except Exception:
+            pass
+    finally:
+        page.remove_listener("response", collect)
+
+    for resp in responses:
+        try:
+            times = times_in(_decode(resp.text()))
+        except Exception:
+            continue
+        if not times:
+            continue
+        template = _make_template(resp, day)
+        if template:
+            log.info("Time-slot API found: %s %s", template.method, template.url)
+            return template, times
+        log.debug("Times in %s but no date parameter to vary", resp.url)
+
+    # No usable API call — fall back to what the page shows for this date
+    try:
+        times = sorted(filter(None, (parse_time(t) for t in page.evaluate(DOM_TIMES_JS))))
+    except Exception:
+        times = []
+    log.info("No time-slot API detected; read %d time(s) from the page", len(times))
+    return None, times
+
+
+def fill_times(
+    page: Page,
+    snapshot: CalendarSnapshot,
+    template: RequestTemplate | None,
+    known: dict[dt.date, list[dt.time]],
+) -> CalendarSnapshot:
+    """Return a snapshot whose slots carry times, one slot per offered time.
+
+    `known` holds times already read during learning. Dates whose times
+    cannot be determined are kept as date-only slots.
+    """
+    times = dict(known)
+    pending = sorted({s.date for s in snapshot.slots} - times.keys())
+
+    if template and pending:
+        start = time.monotonic()
+        try:
+            bodies = page.evaluate(_FETCH_ALL_JS, {
+                "requests": [template.for_date(d) for d in pending],
+                "concurrency": config.DRILL_DOWN_CONCURRENCY,
+            })
+        except Exception as e:
+            log.warning("Time-slot drill-down failed: %s", e)
+            bodies = [None] * len(pending)
+        for day, body in zip(pending, bodies):
+            if body is not None:
+                times[day] = times_in(_decode(body))
+        log.info("Fetched time slots for %d date(s) in %.2fs",
+                 len(pending), time.monotonic() - start)
+
+    slots: list[Slot] = []
+    for s in snapshot.slots:
+        offered = times.get(s.date)
+        if offered:
+            slots.extend(Slot(s.date, t, s.location) for t in offered)
+        else:
+            if s.date in times:
+                log.info("No times offered on %s", s.date_text)
+            slots.append(s)
+    return CalendarSnapshot.build(slots, snapshot.months)
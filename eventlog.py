@@ -0,0 +1,267 @@
+"""Non-blocking structured logging and a small query tool for the event files.
+
+Log calls only put records on a queue; a background listener writes the
+console, the text log and a JSON-lines event file. Every record carries the
+current cycle ID and applicant, and step()/cycle() add timing events.
+
+Summarise event files with:  python eventlog.py [--hours N] [FILES...]
+"""
+import argparse
+import atexit
+import contextlib
+import contextvars
+import datetime as dt
+import glob
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+log = logging.getLogger(__name__)
+
+DEFAULT_EVENT_FILES = "logs/events*.jsonl*"
+
+_cycle = contextvars.ContextVar("cycle", default="")
+_profile = contextvars.ContextVar("profile", default="")
+
+# What this process is doing right now, and how the last cycle went (for status queries)
+_live_lock = threading.Lock()
+_live: dict = {"cycle": "", "step": "", "step_started": None, "steps": {}, "last_cycle": None, "metrics": {}}
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp records with the cycle and applicant of the thread that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.cycle = _cycle.get()
+        record.profile = _profile.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any step/duration/outcome fields."""
+
+    FIELDS = ("event", "step", "duration", "outcome", "data")
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": dt.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "cycle": getattr(record, "cycle", ""),
+            "profile": getattr(record, "profile", ""),
+            "msg": record.getMessage(),
+        }
+        for name in self.FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                event[name] = value
+        return json.dumps(event, ensure_ascii=False)
+
+
+def setup(level: int, text_path: str | None, events_path: str, console: bool = True) -> QueueListener:
+    """Route the root logger through a queue to console, text and JSON-lines handlers."""
+    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    handlers: list[logging.Handler] = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if text_path:
+        handlers.append(RotatingFileHandler(
+            text_path, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
+        ))
+    for h in handlers:
+        h.setFormatter(fmt)
+
+    events = RotatingFileHandler(events_path, maxBytes=20_000_000, backupCount=5, encoding="utf-8")
+    events.setFormatter(JsonFormatter())
+    handlers.append(events)
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop, listener)
+
+    queue_handler = QueueHandler(q)
+    queue_handler.addFilter(_ContextFilter())
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    return listener
+
+
+def stop(listener: QueueListener) -> None:
+    """Flush and stop a listener from setup(); safe to call more than once."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+class _Step:
+    def __init__(self, name: str):
+        self.name = name
+        self.outcome = "ok"
+
+
+def _emit(event: str, name: str, start: float, outcome: str) -> None:
+    duration = round(time.monotonic() - start, 3)
+    level = logging.INFO if outcome == "ok" else logging.WARNING
+    log.log(level, "%s %s: %s in %.2fs", event, name, outcome, duration,
+            extra={"event": event, "step": name, "duration": duration, "outcome": outcome})
+
+
+def live_status() -> dict:
+    """Current cycle and step of this process, plus timings of the last finished cycle."""
+    with _live_lock:
+        status = dict(_live, steps=dict(_live["steps"]), metrics=dict(_live["metrics"]))
+    if status["step_started"] is not None:
+        status["step_elapsed"] = round(time.time() - status.pop("step_started"), 1)
+    else:
+        status.pop("step_started")
+    return status
+
+
+def _set_live(**values) -> None:
+    with _live_lock:
+        _live.update(values)
+
+
+def metric(name: str, values: dict) -> None:
+    """Record a named set of numbers as an event; the latest is kept for live_status()."""
+    with _live_lock:
+        _live["metrics"][name] = values
+    log.info("%s: %s", name, ", ".join(f"{k}={v}" for k, v in values.items()),
+             extra={"event": "metric", "step": name, "data": values})
+
+
+@contextlib.contextmanager
+def step(name: str):
+    """Time a flow step. Set `.outcome` on the yielded object to record a soft failure."""
+    s = _Step(name)
+    start = time.monotonic()
+    _set_live(step=name, step_started=time.time())
+    try:
+        yield s
+    except Exception:
+        _emit("step", name, start, "error")
+        raise
+    finally:
+        with _live_lock:
+            _live["steps"][name] = round(time.monotonic() - start, 3)
+            _live.update(step="", step_started=None)
+    _emit("step", name, start, s.outcome)
+
+
+@contextlib.contextmanager
+def cycle(profile: str = ""):
+    """Give everything logged inside one check a shared cycle ID."""
+    cycle_id = uuid.uuid4().hex[:12]
+    cycle_token = _cycle.set(cycle_id)
+    profile_token = _profile.set(profile)
+    _set_live(cycle=cycle_id, steps={})
+    s = _Step("cycle")
+    start = time.monotonic()
+    try:
+        yield s
+    except Exception:
+        s.outcome = "error"
+        raise
+    finally:
+        _emit("cycle", profile or "default", start, s.outcome)
+        with _live_lock:
+            _live.update(cycle="", last_cycle={
+                "id": cycle_id,
+                "profile": profile,
+                "outcome": s.outcome,
+                "duration": round(time.monotonic() - start, 3),
+                "steps": dict(_live["steps"]),
+            })
+        _cycle.reset(cycle_token)
+        _profile.reset(profile_token)
+
+
+# --- Query tool ---
+
+def _percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def read_events(paths: list[str], since: dt.datetime | None = None):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if since and dt.datetime.fromisoformat(event["ts"]) < since:
+                    continue
+                yield event
+
+
+def summarise(events) -> str:
+    """Failure rates and latency percentiles per step, plus cycle totals."""
+    steps: dict[str, list[dict]] = {}
+    cycles: list[dict] = []
+    metrics: dict[str, list[dict]] = {}
+    recoveries: dict[str, int] = {}
+    for e in events:
+        if e.get("event") == "step":
+            steps.setdefault(e["step"], []).append(e)
+        elif e.get("event") == "cycle":
+            cycles.append(e)
+        elif e.get("event") == "metric":
+            metrics.setdefault(e["step"], []).append(e["data"])
+        elif e.get("event") == "transition" and e["outcome"] != "ok":
+            key = f"{e['data']['from']} -> {e['data']['to'] or 'done'} ({e['outcome']})"
+            recoveries[key] = recoveries.get(key, 0) + 1
+
+    lines = []
+    if cycles:
+        failed = sum(1 for c in cycles if c["outcome"] != "ok")
+        durations = [c["duration"] for c in cycles]
+        lines.append(
+            f"Cycles: {len(cycles)}  failed: {failed} ({100 * failed / len(cycles):.1f}%)  "
+            f"p50: {_percentile(durations, 50):.1f}s  p95: {_percentile(durations, 95):.1f}s"
+        )
+    lines.append(f"{'step':<24}{'count':>7}{'fail%':>8}{'p50 s':>9}{'p95 s':>9}{'max s':>9}")
+    for name, items in sorted(steps.items()):
+        durations = [e["duration"] for e in items]
+        failed = sum(1 for e in items if e["outcome"] != "ok")
+        lines.append(
+            f"{name:<24}{len(items):>7}{100 * failed / len(items):>8.1f}"
+            f"{_percentile(durations, 50):>9.2f}{_percentile(durations, 95):>9.2f}{max(durations):>9.2f}"
+        )
+    if recoveries:
+        lines.append("Flow recoveries: " + ", ".join(
+            f"{key} x{count}" for key, count in sorted(recoveries.items(), key=lambda kv: -kv[1])
+        ))
+    for name, samples in sorted(metrics.items()):
+        keys = [k for k, v in samples[-1].items() if isinstance(v, (int, float))]
+        parts = []
+        for k in keys:
+            values = [s[k] for s in samples if isinstance(s.get(k), (int, float))]
+            parts.append(f"{k} last {values[-1]:g} max {max(values):g}")
+        lines.append(f"{name} ({len(samples)} samples): " + ", ".join(parts))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarise monitor event logs")
+    parser.add_argument("files", nargs="*", help=f"event files (default: {DEFAULT_EVENT_FILES})")
+    parser.add_argument("--hours", type=float, help="only events from the last N hours")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(DEFAULT_EVENT_FILES))
+    if not paths:
+        parser.error("no event files found")
+    since = dt.datetime.now() - dt.timedelta(hours=args.hours) if args.hours else None
+    print(summarise(read_events(paths, since)))
+
+
+if __name__ == "__main__":
+    main()
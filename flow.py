@@ -0,0 +1,107 @@
+"""Resumable state machine for the booking flow.
+
+A check is a fixed sequence of states. A state that fails is retried in
+place, on the same page, according to its RetryPolicy; only when its
+attempts run out does the flow fall back to an earlier state, and only
+up to `max_fallbacks` times per check. A state that raises BudgetExhausted
+ends the flow at once, since retrying would only spend more requests.
+Every transition is logged as a "transition" event so the flow can be
+analysed with eventlog.py.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import eventlog
+
+log = logging.getLogger(__name__)
+
+
+class StepFailed(Exception):
+    """A state could not reach its goal (as opposed to crashing)."""
+
+
+class BudgetExhausted(Exception):
+    """The request budget cannot pay for going on; never retried or fallen back from."""
+
+
+class FlowFailed(Exception):
+    """The flow gave up; `state` is where it stopped."""
+
+    def __init__(self, state: str, cause: Exception):
+        super().__init__(f"{state}: {cause}")
+        self.state = state
+        self.cause = cause
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 2
+    backoff: float = 1.0          # seconds before the first retry, doubled after each
+    fallback: str | None = None   # state to resume from once attempts run out
+
+
+@dataclass(frozen=True)
+class State:
+    name: str
+    run: Callable[[], Any]
+    policy: RetryPolicy = RetryPolicy()
+
+
+def _transition(src: str, dst: str, outcome: str, attempt: int, error: str = "") -> None:
+    level = logging.INFO if outcome == "ok" else logging.WARNING
+    data = {"from": src, "to": dst, "attempt": attempt}
+    if error:
+        data["error"] = error
+    log.log(level, "%s -> %s (%s, attempt %d)%s", src, dst or "done", outcome, attempt,
+            f": {error}" if error else "",
+            extra={"event": "transition", "step": dst or "done", "outcome": outcome, "data": data})
+
+
+def run(states: list[State], max_fallbacks: int = 1) -> dict[str, Any]:
+    """Run the states in order and return each one's result by name.
+
+    Raises FlowFailed when a state has used its attempts and no fallback is
+    left, and lets BudgetExhausted through untouched. The page is never
+    reset here: retries continue from wherever the failed state left it, so
+    states should tolerate being re-entered.
+    """
+    index = {s.name: i for i, s in enumerate(states)}
+    results: dict[str, Any] = {}
+    attempts = dict.fromkeys(index, 0)
+    fallbacks = 0
+    i = 0
+
+    while i < len(states):
+        state = states[i]
+        attempts[state.name] += 1
+        attempt = attempts[state.name]
+        try:
+            with eventlog.step(state.name):
+                results[state.name] = state.run()
+        except BudgetExhausted as e:
+            _transition(state.name, "", "budget", attempt, f"{type(e).__name__}: {e}")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < state.policy.attempts:
+                delay = state.policy.backoff * 2 ** (attempt - 1)
+                _transition(state.name, state.name, "retry", attempt, error)
+                time.sleep(delay)
+                continue
+            fallback = state.policy.fallback
+            if fallback is not None and fallbacks < max_fallbacks:
+                fallbacks += 1
+                _transition(state.name, fallback, "fallback", attempt, error)
+                for s in states[index[fallback]:]:
+                    attempts[s.name] = 0
+                i = index[fallback]
+                continue
+            _transition(state.name, "", "failed", attempt, error)
+            raise FlowFailed(state.name, e) from e
+
+        i += 1
+        _transition(state.name, states[i].name if i < len(states) else "", "ok", attempt)
+
+    return results
@@ -0,0 +1,166 @@
+"""On-disk cache for the site's static bundles, served through context.route().
+
+Only GET requests for static file types are intercepted; API calls and the
+captcha never reach the handler. Cached entries are revalidated with
+If-None-Match / If-Modified-Since once they are older than the revalidation
+period, unless the server marked them immutable.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Request, Route
+
+log = logging.getLogger(__name__)
+
+STATIC_EXTENSIONS = (
+    ".js", ".mjs", ".css", ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+)
+STATIC_RESOURCE_TYPES = {"script", "stylesheet", "font", "image"}
+
+# Never cached even if they look static
+_BYPASS_RE = re.compile(r"captcha|/api/", re.IGNORECASE)
+
+# Response headers not replayed from disk
+_DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "date"}
+
+
+def is_static_url(url: str) -> bool:
+    """True for URLs this cache may serve: static file types, not API or captcha."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or _BYPASS_RE.search(url):
+        return False
+    return parts.path.lower().endswith(STATIC_EXTENSIONS)
+
+
+def _storable(status: int, headers: dict) -> bool:
+    cache_control = headers.get("cache-control", "").lower()
+    return status == 200 and "no-store" not in cache_control and "private" not in cache_control
+
+
+class AssetCache:
+    """Disk-backed static asset cache plus hit/miss counters for one browser context."""
+
+    def __init__(self, directory: str, revalidate_after: float):
+        self.directory = directory
+        self.revalidate_after = revalidate_after
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "bypass": 0, "error": 0}
+        self.bytes_served = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def attach(self, context: BrowserContext) -> None:
+        context.route(is_static_url, self._handle)
+
+    # --- Storage ---
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def _load(self, url: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Atomic replace, so concurrent workers never read a half-written file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _store(self, url: str, status: int, headers: dict, body: bytes) -> dict:
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+            "immutable": "immutable" in headers.get("cache-control", "").lower(),
+            "checked_at": time.time(),
+        }
+        meta_path, body_path = self._paths(url)
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps(meta).encode())
+        return meta
+
+    def _touch(self, url: str, meta: dict) -> None:
+        meta["checked_at"] = time.time()
+        self._write(self._paths(url)[0], json.dumps(meta).encode())
+
+    # --- Routing ---
+
+    def _serve(self, route: Route, meta: dict, body: bytes, outcome: str) -> None:
+        route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+        self.stats[outcome] += 1
+        self.bytes_served += len(body)
+
+    def _handle(self, route: Route, request: Request) -> None:
+        if (request.method != "GET" or request.resource_type not in STATIC_RESOURCE_TYPES
+                or not is_static_url(request.url)):
+            self.stats["bypass"] += 1
+            route.continue_()
+            return
+
+        url = request.url
+        try:
+            cached = self._load(url)
+            if cached:
+                meta, body = cached
+                age = time.time() - meta["checked_at"]
+                if meta["immutable"] or age < self.revalidate_after:
+                    self._serve(route, meta, body, "hit")
+                    return
+
+                validators = {}
+                if meta["etag"]:
+                    validators["if-none-match"] = meta["etag"]
+                if meta["last_modified"]:
+                    validators["if-modified-since"] = meta["last_modified"]
+                if validators:
+                    response = route.fetch(headers={**request.headers, **validators})
+                    if response.status == 304:
+                        self._touch(url, meta)
+                        self._serve(route, meta, body, "revalidated")
+                        return
+                else:
+                    response = route.fetch()
+            else:
+                response = route.fetch()
+
+            body = response.body()
+            if _storable(response.status, response.headers):
+                self._store(url, response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+            self.stats["miss"] += 1
+        except Exception as e:
+            # Fall back to the network untouched; the cache must never break a page
+            self.stats["error"] += 1
+            log.debug("Asset cache error for %s: %s", url, e)
+            try:
+                route.continue_()
+            except Exception:
+                pass
+
+    def report(self) -> str:
+        served = self.stats["hit"] + self.stats["revalidated"]
+        total = served + self.stats["miss"]
+        rate = 100.0 * served / total if total else 0.0
+        return (
+            f"{rate:.0f}% hit rate ({self.stats['hit']} hit, {self.stats['revalidated']} revalidated, "
+            f"{self.stats['miss']} miss, {self.stats['error']} error), "
+            f"{self.bytes_served / 1024:.0f} KiB served from disk"
+        )
@@ -3,54 +3,224 @@ import os
 import signal
 import sys
 import time
-from logging.handlers import RotatingFileHandler
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
+import budget
 import config
+import eventlog
+import pool
 from browser import check_appointments
+from control import Controller, serve
+from coordination import Coordinator
 from notifier import send_alert
+from profiles import Profile, load_profiles
+from slots import CalendarSnapshot, already_notified
 
 # Ensure logs directory exists
 os.makedirs("logs", exist_ok=True)
 
-# Logging setup
+# Logging setup: handlers run on a background thread behind a queue
 log = logging.getLogger()
-log.setLevel(getattr(logging, config.LOG_LEVEL, logging.INFO))
-
-fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
-
-console = logging.StreamHandler()
-console.setFormatter(fmt)
-log.addHandler(console)
-
-file_handler = RotatingFileHandler(
-    "logs/monitor.log", maxBytes=5_000_000, backupCount=3, encoding="utf-8"
+eventlog.setup(
+    getattr(logging, config.LOG_LEVEL, logging.INFO),
+    text_path="logs/monitor.log",
+    events_path="logs/events.jsonl",
 )
-file_handler.setFormatter(fmt)
-log.addHandler(file_handler)
 
 logger = logging.getLogger(__name__)
 
-# Track already-notified dates to avoid duplicate emails
-notified_dates: set[str] = set()
-
 # Graceful shutdown flag
 running = True
 
+# Operator requests from the localhost control interface
+controller = Controller(config.CHECK_INTERVAL_MINUTES)
+
 
 def _shutdown(sig, frame):
     global running
     logger.info("Shutdown signal received — exiting after current cycle.")
     running = False
+    controller.wake()
+    controller.interrupt.set()
 
 
 signal.signal(signal.SIGINT, _shutdown)
 signal.signal(signal.SIGTERM, _shutdown)
 
 
+def _process_snapshot(coordinator: Coordinator, snapshot: CalendarSnapshot, recipient: str = "") -> None:
+    """Diff against the last shared snapshot and alert on slots no instance has notified."""
+    previous = coordinator.publish_snapshot(snapshot)
+    if previous is not None and previous.taken_at > snapshot.taken_at:
+        logger.info("A peer published a newer snapshot — not diffing this one")
+    else:
+        diff = snapshot.diff(previous)
+        for s in diff.added:
+            logger.info("Slot opened: %s", s)
+        for s in diff.removed:
+            logger.info("Slot closed: %s", s)
+        # Forget closed slots so that one which re-opens is alerted again
+        coordinator.forget(diff.removed)
+
+    if not len(snapshot):
+        logger.info("No available slots found")
+        return
+
+    # Includes slots whose alert failed in an earlier cycle
+    notified = coordinator.notified()
+    pending = [s for s in snapshot.ordered() if not already_notified(s, notified)]
+    new_slots = coordinator.claim(pending)
+    if not new_slots:
+        logger.info("Slots found but already notified — skipping email")
+        return
+
+    logger.info("New slots found: %s", [str(s) for s in new_slots])
+    if send_alert(new_slots, recipient):
+        coordinator.mark_sent(new_slots)
+    else:
+        coordinator.release(new_slots)
+        logger.warning("Email failed — will retry next cycle")
+
+
+def _budget_delay(checks: int = 1) -> float:
+    """Seconds until the request budget can pay for `checks` more checks."""
+    requests = budget.get()
+    if requests is None:
+        return 0.0
+    return requests.wait_time(requests.cycle_cost() * checks)
+
+
+def _defer_for_budget(next_run: float) -> float:
+    """`next_run`, pushed back until the request budget can pay for a check."""
+    delay = _budget_delay()
+    if delay > 0 and time.time() + delay > next_run:
+        logger.warning("Request budget short — next check deferred by %.1f minutes",
+                       (time.time() + delay - next_run) / 60)
+        return time.time() + delay
+    return next_run
+
+
+def _report_budget() -> None:
+    requests = budget.get()
+    if requests is not None:
+        eventlog.metric("budget", requests.status())
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=config.WORKERS,
+        initializer=pool.init_worker,
+        initargs=(log.level,),
+    )
+
+
+def _supervise(profiles: list[Profile]) -> None:
+    """Check many applicants on a bounded pool of worker processes.
+
+    Each worker keeps one browser and OCR model for all the checks it runs.
+    Applicants are spread evenly over the check interval; alerts and
+    snapshots are kept per applicant in the coordination database.
+    """
+    interval = config.CHECK_INTERVAL_MINUTES * 60
+    stale_after = interval + 600
+    coordinators = {
+        p.name: Coordinator(
+            config.COORDINATION_DB, interval, stale_after,
+            scope=p.name, offset=interval * i / len(profiles),
+        )
+        for i, p in enumerate(profiles)
+    }
+    # Everyone is checked once at startup, then on their own phase
+    due = {p.name: 0.0 for p in profiles}
+    in_flight: dict[Future, Profile] = {}
+    last_heartbeat = time.time()
+    last_budget_warning = 0.0
+    executor = _new_pool()
+
+    logger.info("Supervising %d applicant(s) on %d worker(s)", len(profiles), config.WORKERS)
+
+    while running:
+        if controller.take_check_request():
+            logger.info("Check requested via control interface — all applicants due now")
+            due = {p.name: 0.0 for p in profiles}
+        minutes = controller.take_interval_change()
+        if minutes:
+            logger.info("Check interval changed to %d minutes", minutes)
+            for i, coordinator in enumerate(coordinators.values()):
+                coordinator.interval = minutes * 60
+                coordinator.offset = minutes * 60 * i / len(profiles)
+            due = {name: c.next_run_at() for name, c in coordinators.items()}
+
+        busy = {p.name for p in in_flight.values()}
+        controller.extra = {"checking": sorted(busy)}
+        ready = [p for p in profiles if p.name not in busy and due[p.name] <= time.time()]
+        # Most overdue first, so a short budget goes to the stalest calendars
+        for p in sorted(ready, key=lambda p: due[p.name]):
+            if controller.paused:
+                break
+            delay = _budget_delay(len(in_flight) + 1)
+            if delay > 0:
+                if time.time() - last_budget_warning >= 300:
+                    logger.warning("Request budget short — holding %d check(s) for %.0fs", len(ready), delay)
+                    last_budget_warning = time.time()
+                break
+            logger.info("--- Queueing appointment check for %s ---", p.name)
+            in_flight[executor.submit(pool.run_check, p)] = p
+
+        if not in_flight:
+            controller.wait(1)
+            continue
+
+        done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+        for fut in done:
+            profile = in_flight.pop(fut, None)
+            if profile is None:
+                continue  # dropped with a broken pool; re-queued as still due
+            coordinator = coordinators[profile.name]
+            try:
+                snapshot = fut.result()
+            except BrokenProcessPool:
+                logger.error("Worker pool broke while checking %s — restarting it", profile.name)
+                snapshot = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                in_flight.clear()
+                executor = _new_pool()
+            except Exception:
+                logger.error("Unhandled error checking %s", profile.name, exc_info=True)
+                snapshot = None
+
+            if snapshot is not None:
+                controller.record_cycle([f"{profile.name}: {s}" for s in snapshot.ordered()])
+                logger.info("[%s] %d available slot(s)", profile.name, len(snapshot))
+                _process_snapshot(coordinator, snapshot, profile.recipient_email)
+            else:
+                logger.warning("[%s] Check failed — keeping previous snapshot", profile.name)
+            due[profile.name] = coordinator.next_run_at()
+            _report_budget()
+
+        if time.time() - last_heartbeat >= 30:
+            for coordinator in coordinators.values():
+                coordinator.heartbeat()
+            last_heartbeat = time.time()
+
+    logger.info("Stopping workers...")
+    executor.shutdown(wait=True, cancel_futures=True)
+    for coordinator in coordinators.values():
+        coordinator.close()
+    logger.info("Monitor stopped.")
+
+
 def main() -> None:
     config.validate()
 
     logger.info("Qatar Visa Center Appointment Monitor started")
+    if config.CONTROL_PORT:
+        serve(controller, config.CONTROL_PORT)
+    if config.PROFILES_FILE:
+        _supervise(load_profiles(config.PROFILES_FILE))
+        return
+
     logger.info(
         "Country: %s | QVC: %s | Interval: %d min | Headless: %s",
         config.COUNTRY_OF_RESIDENCE,
@@ -59,40 +229,63 @@ def main() -> None:
         config.HEADLESS,
     )
 
+    interval = config.CHECK_INTERVAL_MINUTES * 60
+    # A cycle can hold the browser open for CALENDAR_WAIT_MINUTES without heartbeats
+    stale_after = interval + config.CALENDAR_WAIT_MINUTES * 60 + 600
+    coordinator = Coordinator(config.COORDINATION_DB, interval, stale_after)
+
+    next_run = time.time()  # the first check runs at once, budget permitting
     while running:
+        # Sleep until the next phase and until the budget can pay for a check,
+        # waking early for Ctrl+C or control requests
+        next_run = controller.next_check_at = _defer_for_budget(next_run)
+        last_heartbeat = time.time()
+        while running:
+            if controller.take_check_request():
+                logger.info("Check requested via control interface")
+                break
+            minutes = controller.take_interval_change()
+            if minutes:
+                logger.info("Check interval changed to %d minutes", minutes)
+                coordinator.interval = minutes * 60
+                next_run = controller.next_check_at = _defer_for_budget(coordinator.next_run_at())
+            if not controller.paused and time.time() >= next_run:
+                # Peers may have spent the budget meanwhile
+                next_run = controller.next_check_at = _defer_for_budget(next_run)
+                if time.time() >= next_run:
+                    break
+            controller.wait(30 if controller.paused else min(30, max(0, next_run - time.time())))
+            if time.time() - last_heartbeat >= 30:
+                coordinator.heartbeat()
+                last_heartbeat = time.time()
+        controller.next_check_at = None
+        if not running:
+            break
+
         logger.info("--- Running appointment check ---")
+        controller.interrupt.clear()
         try:
-            slots = check_appointments()
+            snapshot = check_appointments(interrupt=controller.interrupt)
         except Exception:
             logger.error("Unhandled error in check_appointments", exc_info=True)
-            slots = []
-
-        if slots:
-            # Filter out already-notified dates
-            new_slots = [s for s in slots if s["date"] not in notified_dates]
-
-            if new_slots:
-                logger.info("New slots found: %s", [s["date"] for s in new_slots])
-                if send_alert(new_slots):
-                    for s in new_slots:
-                        notified_dates.add(s["date"])
-                else:
-                    logger.warning("Email failed — will retry next cycle")
-            else:
-                logger.info("Slots found but already notified — skipping email")
-        else:
-            logger.info("No available slots found")
+            snapshot = None
+        coordinator.heartbeat()
+        _report_budget()
 
-        if not running:
-            break
+        if snapshot is not None:
+            controller.record_cycle([str(s) for s in snapshot.ordered()])
+            _process_snapshot(coordinator, snapshot)
+        else:
+            logger.warning("Check failed — keeping previous snapshot")
 
-        logger.info("Next check in %d minutes...", config.CHECK_INTERVAL_MINUTES)
-        # Sleep in small increments so Ctrl+C is responsive
-        for _ in range(config.CHECK_INTERVAL_MINUTES * 60):
-            if not running:
-                break
-            time.sleep(1)
+        next_run = coordinator.next_run_at()
+        logger.info(
+            "Next check in %.1f minutes (%d instance(s) sharing the schedule)...",
+            (next_run - time.time()) / 60,
+            len(coordinator.peers()),
+        )
 
+    coordinator.close()
     logger.info("Monitor stopped.")
 
 
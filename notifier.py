@@ -5,6 +5,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import config
+from slots import BookingResult, Slot
 
 log = logging.getLogger(__name__)
 
@@ -12,17 +13,17 @@ MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 
 
-def send_alert(slots: list[dict]) -> bool:
+def send_alert(slots: list[Slot], recipient: str = "") -> bool:
     """Send an HTML email listing available appointment slots.
 
-    Each slot dict should have keys: 'date' and optionally 'time', 'location'.
+    Goes to `recipient`, or RECIPIENT_EMAIL when empty.
     Returns True if the email was sent successfully.
     """
     rows = ""
     for s in slots:
-        date = s.get("date", "Unknown")
-        slot_time = s.get("time", "—")
-        location = s.get("location", config.QVC_LOCATION)
+        date = s.date_text
+        slot_time = s.time_text or "—"
+        location = s.location or config.QVC_LOCATION
         rows += f"<tr><td>{date}</td><td>{slot_time}</td><td>{location}</td></tr>\n"
 
     html = f"""\
@@ -38,10 +39,48 @@ def send_alert(slots: list[dict]) -> bool:
     </body>
     </html>"""
 
+    return _send(f"QVC Appointment Available — {len(slots)} slot(s) found", html, recipient)
+
+
+def send_booking_result(result: BookingResult, recipient: str = "") -> bool:
+    """Send an HTML email reporting an auto-booking attempt.
+
+    Goes to `recipient`, or RECIPIENT_EMAIL when empty.
+    Returns True if the email was sent successfully.
+    """
+    if result.booked:
+        subject = f"QVC Appointment BOOKED — {result.slot}"
+        heading = "Qatar Visa Center — Appointment Booked!"
+    else:
+        subject = f"QVC auto-booking failed — {result.slot}"
+        heading = "Qatar Visa Center — Auto-booking Failed"
+
+    html = f"""\
+    <html>
+    <body>
+    <h2>{heading}</h2>
+    <table border="1" cellpadding="6" cellspacing="0">
+      <tr><th>Date</th><td>{result.slot.date_text}</td></tr>
+      <tr><th>Time</th><td>{result.slot.time_text or "—"}</td></tr>
+      <tr><th>Location</th><td>{result.slot.location or config.QVC_LOCATION}</td></tr>
+      <tr><th>Claim latency</th><td>{result.latency:.2f} s</td></tr>
+      <tr><th>Details</th><td>{result.detail or "—"}</td></tr>
+    </table>
+    <p><a href="{config.BOOKING_URL}">Open QVC &rarr;</a></p>
+    <p style="color:gray;font-size:12px;">Sent by hussain_bot appointment monitor.</p>
+    </body>
+    </html>"""
+
+    return _send(subject, html, recipient)
+
+
+def _send(subject: str, html: str, recipient: str = "") -> bool:
+    """Send an HTML email, retrying on SMTP errors."""
+    recipient = recipient or config.RECIPIENT_EMAIL
     msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"QVC Appointment Available — {len(slots)} slot(s) found"
+    msg["Subject"] = subject
     msg["From"] = config.SMTP_USER
-    msg["To"] = config.RECIPIENT_EMAIL
+    msg["To"] = recipient
     msg.attach(MIMEText(html, "html"))
 
     for attempt in range(1, MAX_RETRIES + 1):
@@ -49,8 +88,8 @@ def send_alert(slots: list[dict]) -> bool:
             with smtplib.SMTP(config.SMTP_HOST, config.SMTP_PORT, timeout=30) as server:
                 server.starttls()
                 server.login(config.SMTP_USER, config.SMTP_PASSWORD)
-                server.sendmail(config.SMTP_USER, config.RECIPIENT_EMAIL, msg.as_string())
-            log.info("Email alert sent to %s", config.RECIPIENT_EMAIL)
+                server.sendmail(config.SMTP_USER, recipient, msg.as_string())
+            log.info("Email alert sent to %s", recipient)
             return True
         except Exception:
             log.warning("SMTP attempt %d/%d failed", attempt, MAX_RETRIES, exc_info=True)
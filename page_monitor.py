@@ -0,0 +1,216 @@
+"""Headless port of the extension's in-page monitor (Content.js).
+
+The extension's findCalendar / findSelectableDates scan and its two-minute
+performSessionClick keepalive are injected with add_init_script instead of
+loading the unpacked extension, so they run in headless Chromium under the
+normal launch() path. There is no panel, alarm or auto-click; selectable
+dates are reported back to Python through an exposed function.
+"""
+import logging
+import time
+
+from playwright.sync_api import BrowserContext, Page
+
+log = logging.getLogger(__name__)
+
+# Scans follow DOM mutations; this is only the safety-net rescan
+SCAN_INTERVAL_MS = 30_000
+SESSION_CLICK_INTERVAL_MS = 120_000
+
+_BINDING = "__qvcMonitorReport"
+
+MONITOR_JS = """
+(() => {
+  if (window.__qvcMonitor) return;
+  const report = (kind, data) => {
+    try { window.%(binding)s({kind, ...data}); } catch (e) {}
+  };
+
+  function findCalendar() {
+    const dayPattern = ['S', 'M', 'T', 'W', 'T', 'F', 'S'];
+    for (const table of document.querySelectorAll('table')) {
+      const rows = table.querySelectorAll('tr');
+      if (rows.length < 2) continue;
+      let headerCount = 0;
+      rows[0].querySelectorAll('th, td').forEach((cell, i) => {
+        if (i < dayPattern.length && cell.textContent.trim() === dayPattern[i]) headerCount++;
+      });
+      if (headerCount >= 3) return table;
+    }
+    return null;
+  }
+
+  // td -> selectable?, dropped for cells that mutate
+  const selectableCache = new Map();
+
+  function findSelectableDates(calendar) {
+    const days = [];
+    for (const cell of calendar.querySelectorAll('td')) {
+      const text = cell.textContent.trim();
+      if (!/^\\d+$/.test(text)) continue;
+      const num = parseInt(text, 10);
+      if (num < 1 || num > 31) continue;
+      let selectable = selectableCache.get(cell);
+      if (selectable === undefined) {
+        const color = getComputedStyle(cell).color;
+        const unavailable = ['weekend', 'holiday', 'disabled'].some(c => cell.classList.contains(c));
+        selectable = color.includes('0, 0, 0') && !unavailable;
+        selectableCache.set(cell, selectable);
+      }
+      if (selectable) days.push(num);
+    }
+    return days.sort((a, b) => a - b);
+  }
+
+  function performSessionClick() {
+    const calendar = findCalendar();
+    let target = 'page';
+    if (calendar) {
+      const cells = calendar.querySelectorAll('td');
+      const cell = Array.from(cells).slice(7).find(c => /^\\d+$/.test(c.textContent.trim()));
+      (cell || calendar).click();
+      target = cell ? 'date ' + cell.textContent.trim() : 'calendar';
+    } else {
+      const header = document.querySelector('h1, h2, h3, .header, .title');
+      (header || document.body).click();
+      target = header ? 'header' : 'page';
+    }
+    fetch(location.href, {method: 'HEAD', cache: 'no-store', credentials: 'include'}).catch(() => {});
+    report('keepalive', {target});
+  }
+
+  // Same observer split as Content.js: a cheap document-wide observer that only
+  // looks for the calendar (re)appearing, and one scoped to the calendar table
+  // that invalidates just the cells that changed. Scans are coalesced per microtask.
+  let pageObserver = null, calendarObserver = null, clickTimer = null, fallbackTimer = null;
+  // Days selectable at the previous scan, and the month header they were read under
+  let calendar = null, previous = null, previousMonth = '', queued = false;
+
+  function monthHeader() {
+    const header = document.querySelector('th.month, .datepicker-switch, button.current');
+    return header ? header.textContent.trim() : '';
+  }
+
+  function queueScan() {
+    if (queued) return;
+    queued = true;
+    queueMicrotask(scan);
+  }
+
+  function watchCalendar(table) {
+    if (calendarObserver) calendarObserver.disconnect();
+    calendar = table;
+    selectableCache.clear();
+    calendarObserver = new MutationObserver(mutations => {
+      for (const m of mutations) {
+        if (m.type === 'childList' && ['TABLE', 'THEAD', 'TBODY', 'TR'].includes(m.target.nodeName)) {
+          // Rows replaced (e.g. month changed): every cached cell is stale
+          selectableCache.clear();
+          break;
+        }
+        const el = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        const cell = el && el.closest('td');
+        if (cell) selectableCache.delete(cell);
+        else selectableCache.clear();
+      }
+      queueScan();
+    });
+    calendarObserver.observe(table, {
+      childList: true, subtree: true, characterData: true,
+      attributes: true, attributeFilter: ['class', 'style', 'disabled'],
+    });
+  }
+
+  function getCalendar() {
+    if (calendar && calendar.isConnected) return calendar;
+    const table = findCalendar();
+    if (table) watchCalendar(table);
+    else if (calendar) {
+      if (calendarObserver) calendarObserver.disconnect();
+      calendar = calendarObserver = null;
+      selectableCache.clear();
+    }
+    return table;
+  }
+
+  function scan() {
+    queued = false;
+    const table = getCalendar();
+    if (!table) return;
+    const days = findSelectableDates(table);
+    const month = monthHeader();
+    // The first scan after start() (or of another month) is the starting point:
+    // the scraper has already judged those days, so only later openings are reported
+    const opened = previous && month === previousMonth ? days.filter(d => !previous.includes(d)) : [];
+    previous = days;
+    previousMonth = month;
+    if (opened.length) report('dates', {days: opened});
+  }
+
+  window.__qvcMonitor = {
+    findCalendar, findSelectableDates, performSessionClick,
+    start(opts) {
+      this.stop();
+      previous = null;
+      scan();
+      pageObserver = new MutationObserver(() => {
+        // Cheap while the watched calendar is still attached
+        if (calendar && calendar.isConnected) return;
+        queueScan();
+      });
+      pageObserver.observe(document.body, {childList: true, subtree: true});
+      fallbackTimer = setInterval(scan, opts.scanMs);
+      performSessionClick();
+      clickTimer = setInterval(performSessionClick, opts.clickMs);
+    },
+    stop() {
+      [pageObserver, calendarObserver].forEach(o => o && o.disconnect());
+      clearInterval(fallbackTimer);
+      clearInterval(clickTimer);
+      pageObserver = calendarObserver = fallbackTimer = clickTimer = null;
+      calendar = null;
+      selectableCache.clear();
+    },
+  };
+  // Same trigger the extension listens for
+  window.addEventListener('qvc-auto-start', () =>
+    window.__qvcMonitor.start({scanMs: %(scan_ms)d, clickMs: %(click_ms)d}));
+})();
+""" % {"binding": _BINDING, "scan_ms": SCAN_INTERVAL_MS, "click_ms": SESSION_CLICK_INTERVAL_MS}
+
+
+class PageMonitor:
+    """Collects the injected monitor's reports for one browser context.
+
+    Reports arrive while Playwright is processing events, i.e. during any
+    page call or page.wait_for_timeout(); read them with take_dates().
+    """
+
+    def __init__(self):
+        self._dates: set[int] = set()
+        self.keepalives = 0
+        self.last_keepalive: float | None = None
+
+    def install(self, context: BrowserContext) -> None:
+        context.expose_function(_BINDING, self._on_report)
+        context.add_init_script(MONITOR_JS)
+        log.info("In-page monitor injected (headless-capable)")
+
+    def start(self, page: Page) -> None:
+        page.evaluate("window.dispatchEvent(new CustomEvent('qvc-auto-start'))")
+        log.info("In-page monitor started on calendar page")
+
+    def _on_report(self, report: dict) -> None:
+        if report.get("kind") == "dates":
+            days = report.get("days") or []
+            self._dates.update(days)
+            log.debug("In-page monitor: days opened %s", days)
+        elif report.get("kind") == "keepalive":
+            self.keepalives += 1
+            self.last_keepalive = time.time()
+            log.info("Session keepalive #%d (clicked %s)", self.keepalives, report.get("target"))
+
+    def take_dates(self) -> list[int] | None:
+        """Day numbers that became selectable since the monitor started or was last read, or None."""
+        dates, self._dates = self._dates, set()
+        return sorted(dates) or None
@@ -0,0 +1,76 @@
+"""Worker-process side of the multi-applicant supervisor (see monitor.py).
+
+Kept free of import-time side effects so that spawned workers can import it.
+"""
+import logging
+import os
+import signal
+from multiprocessing import util
+
+from playwright.sync_api import sync_playwright
+
+import browser
+import browser_watchdog
+import eventlog
+from profiles import Profile
+from slots import CalendarSnapshot
+
+log = logging.getLogger(__name__)
+
+# One Playwright driver and browser per worker process, shared by all its checks
+_pw = None
+_browser = None
+_listener = None
+
+
+def init_worker(log_level: int) -> None:
+    """Process-pool initializer: start the worker's shared browser."""
+    global _pw, _browser, _listener
+
+    # The supervisor handles Ctrl+C and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Own event file per worker: rotating handlers cannot share one file across processes
+    os.makedirs("logs", exist_ok=True)
+    _listener = eventlog.setup(log_level, text_path=None, events_path=f"logs/events-worker-{os.getpid()}.jsonl")
+
+    browser_watchdog.reap_orphans()
+    _pw = sync_playwright().start()
+    _browser = browser.launch_shared_browser(_pw)
+    util.Finalize(None, _close_worker, exitpriority=10)
+    log.info("Worker ready")
+
+
+def _close_worker() -> None:
+    for close in (
+        _browser and _browser.close,
+        _pw and _pw.stop,
+        # Workers exit without running atexit, so flush the log queue here
+        _listener and (lambda: eventlog.stop(_listener)),
+    ):
+        try:
+            if close:
+                close()
+        except Exception:
+            pass
+
+
+def run_check(profile: Profile) -> CalendarSnapshot | None:
+    """Check one applicant in a fresh context of this worker's browser."""
+    global _browser
+    if not _browser.is_connected():
+        log.warning("Worker browser disconnected — relaunching")
+        browser_watchdog.reap_orphans()
+        _browser = browser.launch_shared_browser(_pw)
+    try:
+        return browser.check_appointments(profile, _browser)
+    finally:
+        reason = browser_watchdog.check()
+        if reason:
+            log.warning("Worker browser over resource limit (%s) — recycling", reason)
+            try:
+                _browser.close()
+            except Exception:
+                pass
+            browser_watchdog.reap_orphans()
+            _browser = browser.launch_shared_browser(_pw)
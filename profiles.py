@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, fields
+
+import config
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Profile:
+    """One applicant to monitor. Center, country and recipient default to the .env values."""
+
+    name: str
+    passport_number: str
+    visa_number: str
+    mobile_number: str
+    email_address: str
+    qvc_location: str = ""
+    country: str = ""
+    recipient_email: str = ""
+
+    def __post_init__(self):
+        # Frozen, so fill defaults through object.__setattr__
+        for attr, default in (
+            ("qvc_location", config.QVC_LOCATION),
+            ("country", config.COUNTRY_OF_RESIDENCE),
+            ("recipient_email", config.RECIPIENT_EMAIL),
+        ):
+            if not getattr(self, attr):
+                object.__setattr__(self, attr, default)
+
+    @classmethod
+    def from_config(cls) -> "Profile":
+        """The single applicant configured directly in .env."""
+        return cls(
+            name="default",
+            passport_number=config.PASSPORT_NUMBER,
+            visa_number=config.VISA_NUMBER,
+            mobile_number=config.MOBILE_NUMBER,
+            email_address=config.EMAIL_ADDRESS,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Profile":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown profile field(s): {', '.join(sorted(unknown))}")
+        values = {k: str(v).strip() for k, v in data.items()}
+        missing = [k for k in ("name", "passport_number", "visa_number",
+                               "mobile_number", "email_address") if not values.get(k)]
+        # Without a recipient every alert for this applicant would fail to send
+        if not values.get("recipient_email") and not config.RECIPIENT_EMAIL:
+            missing.append("recipient_email (or RECIPIENT_EMAIL in .env)")
+        if missing:
+            raise ValueError(f"Profile {values.get('name', '?')!r} is missing: {', '.join(missing)}")
+        return cls(**values)
+
+
+def load_profiles(path: str) -> list[Profile]:
+    """Load applicants from a JSON or YAML file.
+
+    The file holds either a list of applicants or {"applicants": [...]}.
+    YAML needs PyYAML installed.
+    """
+    with open(path, encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("PyYAML is required for YAML profile files (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        if "applicants" not in data:
+            raise ValueError(f"{path}: expected a list of applicants or an 'applicants' key")
+        data = data["applicants"]
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"{path}: no applicants listed")
+    profiles = [Profile.from_dict(item) for item in data]
+
+    names = [p.name for p in profiles]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate profile name(s): {', '.join(duplicates)}")
+
+    log.info("Loaded %d applicant profile(s) from %s", len(profiles), path)
+    return profiles
@@ -0,0 +1,194 @@
+import datetime as dt
+import re
+import time
+from dataclasses import dataclass, field
+
+MONTHS = {
+    name.lower(): idx
+    for idx, name in enumerate(
+        ["January", "February", "March", "April", "May", "June", "July",
+         "August", "September", "October", "November", "December"],
+        start=1,
+    )
+}
+
+_MONTH_RE = re.compile(r"([A-Za-z]{3,9})\.?,?\s+(\d{4})")
+_TIME_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])?\s*$")
+
+
+def parse_month(text: str) -> tuple[int, int] | None:
+    """Parse a calendar header such as 'February 2026' or 'Feb 2026' into (year, month)."""
+    for name, year in _MONTH_RE.findall(text or ""):
+        name = name.lower()
+        for full, idx in MONTHS.items():
+            if full == name or (len(name) >= 3 and full.startswith(name)):
+                return int(year), idx
+    return None
+
+
+def parse_time(text: str) -> dt.time | None:
+    """Parse '9:30', '09:30' or '2:15 PM' into a time. Returns None if unparseable."""
+    m = _TIME_RE.match(text or "")
+    if not m:
+        return None
+    hour, minute, meridiem = int(m.group(1)), int(m.group(2)), m.group(3)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    try:
+        return dt.time(hour, minute)
+    except ValueError:
+        return None
+
+
+def add_months(year: int, month: int, offset: int) -> tuple[int, int]:
+    """Return (year, month) shifted by offset months."""
+    idx = year * 12 + (month - 1) + offset
+    return idx // 12, idx % 12 + 1
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """One bookable appointment: a calendar date, optional time and the QVC center."""
+
+    date: dt.date
+    time: dt.time | None = None
+    location: str = ""
+
+    @property
+    def month(self) -> tuple[int, int]:
+        return self.date.year, self.date.month
+
+    @property
+    def sort_key(self) -> tuple:
+        return self.date, self.time or dt.time.min, self.location
+
+    @property
+    def date_text(self) -> str:
+        return self.date.strftime("%d %B %Y")
+
+    @property
+    def time_text(self) -> str:
+        return self.time.strftime("%H:%M") if self.time else ""
+
+    @property
+    def day(self) -> tuple[dt.date, str]:
+        """The (date, location) this slot belongs to, whether or not its time is known."""
+        return self.date, self.location
+
+    @property
+    def key(self) -> str:
+        """Stable string identity, e.g. '2026-02-03|09:30|Islamabad'."""
+        return f"{self.date.isoformat()}|{self.time_text}|{self.location}"
+
+    @classmethod
+    def from_key(cls, key: str) -> "Slot":
+        date, slot_time, location = key.split("|", 2)
+        return cls(
+            date=dt.date.fromisoformat(date),
+            time=dt.time.fromisoformat(slot_time) if slot_time else None,
+            location=location,
+        )
+
+    def __str__(self) -> str:
+        parts = [self.date_text, self.time_text, self.location]
+        return " ".join(p for p in parts if p)
+
+
+@dataclass(frozen=True, slots=True)
+class BookingResult:
+    """Outcome of an auto-booking attempt. `latency` runs from detection to the final answer."""
+
+    slot: Slot
+    booked: bool
+    latency: float
+    detail: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class SlotDiff:
+    """Changes between two consecutive calendar snapshots."""
+
+    added: tuple[Slot, ...] = ()
+    removed: tuple[Slot, ...] = ()
+    unchanged: tuple[Slot, ...] = ()
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+@dataclass(frozen=True, slots=True)
+class CalendarSnapshot:
+    """Available slots seen in one pass over the calendar.
+
+    `months` records which (year, month) pages were actually scanned, so that
+    a month skipped in this pass is never mistaken for one that emptied out.
+    """
+
+    slots: frozenset[Slot] = frozenset()
+    months: frozenset[tuple[int, int]] = frozenset()
+    taken_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def build(cls, slots, months=()) -> "CalendarSnapshot":
+        slots = frozenset(slots)
+        return cls(slots=slots, months=frozenset(months) | {s.month for s in slots})
+
+    def to_dict(self) -> dict:
+        return {
+            "slots": sorted(s.key for s in self.slots),
+            "months": sorted(self.months),
+            "taken_at": self.taken_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalendarSnapshot":
+        return cls(
+            slots=frozenset(Slot.from_key(k) for k in data["slots"]),
+            months=frozenset(tuple(m) for m in data["months"]),
+            taken_at=data["taken_at"],
+        )
+
+    def ordered(self) -> list[Slot]:
+        return sorted(self.slots, key=lambda s: s.sort_key)
+
+    def diff(self, previous: "CalendarSnapshot | None") -> SlotDiff:
+        """Compare against the previous snapshot (None means nothing seen before).
+
+        A day whose times were read in one pass but not the other (date-only
+        slot on one side, timed slots on the other) counts as unchanged, so a
+        failed time drill-down never looks like slots closing and re-opening.
+        """
+        key = lambda s: s.sort_key  # noqa: E731
+        if previous is None:
+            return SlotDiff(added=tuple(self.ordered()))
+        vague = _timed_days(self.slots) ^ _timed_days(previous.slots)
+        vague &= {s.day for s in self.slots} & {s.day for s in previous.slots}
+        added = {s for s in self.slots - previous.slots if s.day not in vague}
+        # Only slots in months covered by both passes can be judged as gone
+        removed = {
+            s for s in previous.slots - self.slots if s.month in self.months and s.day not in vague
+        }
+        unchanged = (self.slots & previous.slots) | {s for s in self.slots if s.day in vague}
+        return SlotDiff(
+            added=tuple(sorted(added, key=key)),
+            removed=tuple(sorted(removed, key=key)),
+            unchanged=tuple(sorted(unchanged, key=key)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+
+def _timed_days(slots) -> set[tuple[dt.date, str]]:
+    return {s.day for s in slots if s.time is not None}
+
+
+def already_notified(slot: Slot, notified_keys: set[str]) -> bool:
+    """True if this slot, or its day while the times were unknown or known, was alerted before."""
+    if slot.key in notified_keys:
+        return True
+    if slot.time is not None:
+        return Slot(slot.date, None, slot.location).key in notified_keys
+    prefix = f"{slot.date.isoformat()}|"
+    return any(k.startswith(prefix) and k.split("|", 2)[2] == slot.location for k in notified_keys)
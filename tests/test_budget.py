@@ -0,0 +1,51 @@
+import multiprocessing
+
+import pytest
+
+import budget
+import config
+from budget import RequestBudget
+
+
+def test_counts_are_written_on_flush_and_spent_meanwhile(tmp_path):
+    path = str(tmp_path / "coordination.db")
+    requests = RequestBudget(path, per_hour=100, per_day=0)
+    other = RequestBudget(path, per_hour=100, per_day=0)
+
+    for _ in range(30):
+        requests.record("api")
+    requests.record("navigation", 10)
+
+    # Visible to this process at once, to others only after the flush
+    assert requests.status()["tokens_hour"] == pytest.approx(60, abs=0.1)
+    assert other.status()["tokens_hour"] == pytest.approx(100, abs=0.1)
+
+    requests.flush()
+    assert requests.status()["tokens_hour"] == pytest.approx(60, abs=0.1)
+    assert other.status()["tokens_hour"] == pytest.approx(60, abs=0.1)
+    assert "api" in other.report() and requests.spent == 40
+
+
+def _child_budget(queue):
+    requests = budget.get()
+    queue.put((requests.spent, sum(requests._pending.values())))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_worker_gets_its_own_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "COORDINATION_DB", str(tmp_path / "coordination.db"))
+    monkeypatch.setattr(config, "REQUEST_BUDGET_PER_HOUR", 100)
+    monkeypatch.setattr(budget, "_budget", None)
+    parent = budget.get()
+    parent.record("api", 5)
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child_budget, args=(queue,))
+    proc.start()
+    spent, pending = queue.get(timeout=30)
+    proc.join(timeout=30)
+
+    # The parent's unflushed counts stay with the parent
+    assert spent == pending == 0
+    assert parent.spent == 5
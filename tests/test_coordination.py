@@ -0,0 +1,36 @@
+import datetime as dt
+import multiprocessing
+
+from coordination import Coordinator
+from slots import Slot
+
+SLOTS = [Slot(dt.date(2026, 3, day), dt.time(9), "Islamabad") for day in range(1, 21)]
+PROCESSES = 6
+
+
+def _claim(path, barrier, results):
+    coordinator = Coordinator(path, interval=60, stale_after=120, scope="test")
+    barrier.wait()
+    won = coordinator.claim(SLOTS)
+    results.put((coordinator.id, [s.key for s in won]))
+
+
+def test_each_slot_is_claimed_by_exactly_one_process(tmp_path):
+    path = str(tmp_path / "coordination.db")
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(PROCESSES)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_claim, args=(path, barrier, results)) for _ in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    claims = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    winners: dict[str, list[str]] = {}
+    for instance, keys in claims:
+        for key in keys:
+            winners.setdefault(key, []).append(instance)
+    assert sorted(winners) == sorted(s.key for s in SLOTS)
+    assert all(len(ids) == 1 for ids in winners.values())
@@ -0,0 +1,63 @@
+import datetime as dt
+
+from coordination import Coordinator
+from drilldown import times_in
+from slots import CalendarSnapshot, Slot, already_notified
+
+DAY = dt.date(2026, 3, 5)
+
+
+def test_times_in_ignores_timestamps_and_unavailable_entries():
+    payload = {
+        "date": "2026-03-05T00:00:00",
+        "slots": [{"time": "09:30", "available": False}, {"time": "10:00", "available": True}],
+        "serverTime": "2026-03-01 14:22:05",
+    }
+    assert times_in(payload) == [dt.time(10, 0)]
+
+
+def test_times_in_reads_plain_and_meridiem_times():
+    payload = ["09:00", "2:30 PM", {"slot": "11:00", "isBooked": True}, {"slot": "12:00", "disabled": "false"}]
+    assert times_in(payload) == [dt.time(9, 0), dt.time(12, 0), dt.time(14, 30)]
+
+
+def test_failed_drill_down_does_not_change_slot_identity():
+    timed = CalendarSnapshot.build([Slot(DAY, dt.time(9), "Islamabad"), Slot(DAY, dt.time(10), "Islamabad")])
+    date_only = CalendarSnapshot.build([Slot(DAY, None, "Islamabad")])
+
+    for current, previous in ((date_only, timed), (timed, date_only)):
+        diff = current.diff(previous)
+        assert not diff.added and not diff.removed
+
+    assert already_notified(Slot(DAY, None, "Islamabad"), {s.key for s in timed.slots})
+    assert already_notified(Slot(DAY, dt.time(9), "Islamabad"), {Slot(DAY, None, "Islamabad").key})
+    # A genuinely new time on a day alerted with times is still new
+    assert not already_notified(Slot(DAY, dt.time(11), "Islamabad"), {Slot(DAY, dt.time(9), "Islamabad").key})
+
+
+def _alert_pass(coordinator, slots):
+    """One monitor pass: diff, forget closed slots, claim and mark what would be alerted."""
+    snapshot = CalendarSnapshot.build(slots, {(DAY.year, DAY.month)})
+    coordinator.forget(snapshot.diff(coordinator.last_snapshot()).removed)
+    coordinator.publish_snapshot(snapshot)
+    notified = coordinator.notified()
+    won = coordinator.claim([s for s in snapshot.ordered() if not already_notified(s, notified)])
+    coordinator.mark_sent(won)
+    return won
+
+
+def test_reopened_slot_alerts_again_after_a_date_only_pass(tmp_path):
+    timed, date_only = Slot(DAY, dt.time(9), "Islamabad"), Slot(DAY, None, "Islamabad")
+    for first, middle in ((timed, date_only), (date_only, timed)):
+        coordinator = Coordinator(str(tmp_path / f"{first.key}.db"), interval=60, stale_after=120)
+        assert _alert_pass(coordinator, [first]) == [first]
+        assert _alert_pass(coordinator, [middle]) == []
+        assert _alert_pass(coordinator, []) == []
+        assert _alert_pass(coordinator, [first]) == [first]
+
+
+def test_closing_one_time_keeps_the_other_times_of_the_day_notified(tmp_path):
+    nine, ten = Slot(DAY, dt.time(9), "Islamabad"), Slot(DAY, dt.time(10), "Islamabad")
+    coordinator = Coordinator(str(tmp_path / "c.db"), interval=60, stale_after=120)
+    assert _alert_pass(coordinator, [nine, ten]) == [nine, ten]
+    assert _alert_pass(coordinator, [ten]) == []
@@ -0,0 +1,31 @@
+import pytest
+
+import flow
+
+
+def _states(calls, failing, exc):
+    def step(name):
+        def run():
+            calls.append(name)
+            if name == failing:
+                raise exc
+            return name
+        return run
+
+    policy = {"b": flow.RetryPolicy(attempts=2, backoff=0, fallback="a")}
+    return [flow.State(n, step(n), policy.get(n, flow.RetryPolicy(backoff=0))) for n in ("a", "b", "c")]
+
+
+def test_failing_state_is_retried_then_falls_back():
+    calls = []
+    with pytest.raises(flow.FlowFailed) as info:
+        flow.run(_states(calls, "b", flow.StepFailed("nope")), max_fallbacks=1)
+    assert info.value.state == "b"
+    assert calls == ["a", "b", "b", "a", "b", "b"]
+
+
+def test_budget_exhausted_is_neither_retried_nor_fallen_back_from():
+    calls = []
+    with pytest.raises(flow.BudgetExhausted):
+        flow.run(_states(calls, "b", flow.BudgetExhausted("empty")), max_fallbacks=1)
+    assert calls == ["a", "b"]
@@ -0,0 +1,148 @@
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_cache import AssetCache
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 02 Mar 2026 10:00:00 GMT"
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    hits: list[str] = []
+
+    def do_GET(self):
+        type(self).hits.append(self.path)
+        if self.path.startswith("/static/app.js") and self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"/* {self.path} */".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        immutable = self.path.startswith("/static/vendor")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable" if immutable else "max-age=0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = {k.lower(): v for k, v in headers.items()}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class _Request:
+    def __init__(self, url, method="GET", resource_type="script"):
+        self.url = url
+        self.method = method
+        self.resource_type = resource_type
+        self.headers = {}
+
+
+class _Route:
+    """Stand-in for a Playwright Route that fetches with urllib."""
+
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+        self.body = None
+
+    def fetch(self, headers=None):
+        req = urllib.request.Request(self.request.url, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return _Response(resp.status, dict(resp.headers), resp.read())
+        except urllib.error.HTTPError as e:
+            return _Response(e.code, dict(e.headers), b"")
+
+    def fulfill(self, response=None, status=None, headers=None, body=None):
+        self.outcome = "fulfilled"
+        self.body = body
+
+    def continue_(self):
+        self.outcome = "continued"
+
+
+@pytest.fixture
+def server():
+    _AssetHandler.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _AssetHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(cache, url, **kwargs):
+    route = _Route(_Request(url, **kwargs))
+    cache._handle(route, route.request)
+    return route
+
+
+def test_immutable_asset_is_served_from_disk(server, tmp_path):
+    cache = AssetCache(str(tmp_path), revalidate_after=0)
+    url = f"{server}/static/vendor.js"
+
+    assert _get(cache, url).body == b"/* /static/vendor.js */"
+    route = _get(cache, url)
+
+    assert route.outcome == "fulfilled" and route.body == b"/* /static/vendor.js */"
+    assert cache.stats["miss"] == 1 and cache.stats["hit"] == 1
+    assert _AssetHandler.hits == ["/static/vendor.js"]
+
+
+def test_stale_asset_is_revalidated_with_etag(server, tmp_path):
+    cache = AssetCache(str(tmp_path), revalidate_after=0)
+    url = f"{server}/static/app.js"
+
+    _get(cache, url)
+    route = _get(cache, url)
+
+    assert route.outcome == "fulfilled" and route.body == b"/* /static/app.js */"
+    assert cache.stats["miss"] == 1 and cache.stats["revalidated"] == 1
+    assert len(_AssetHandler.hits) == 2
+
+
+def test_fresh_asset_is_a_hit_until_revalidation_is_due(server, tmp_path):
+    cache = AssetCache(str(tmp_path), revalidate_after=3600)
+    url = f"{server}/static/app.js"
+
+    _get(cache, url)
+    _get(cache, url)
+
+    assert cache.stats["hit"] == 1
+    assert len(_AssetHandler.hits) == 1
+
+
+@pytest.mark.parametrize("path", ["/api/slots.js", "/static/captcha.png", "/Captcha/image.jpg"])
+def test_api_and_captcha_urls_bypass_the_cache(server, tmp_path, path):
+    cache = AssetCache(str(tmp_path), revalidate_after=3600)
+
+    for _ in range(2):
+        route = _get(cache, f"{server}{path}", resource_type="image")
+        assert route.outcome == "continued"
+
+    assert cache.stats["bypass"] == 2 and cache.stats["hit"] == cache.stats["miss"] == 0
+
+
+def test_non_get_and_non_static_requests_bypass_the_cache(server, tmp_path):
+    cache = AssetCache(str(tmp_path), revalidate_after=3600)
+
+    assert _get(cache, f"{server}/static/app.js", method="POST").outcome == "continued"
+    assert _get(cache, f"{server}/static/app.js", resource_type="xhr").outcome == "continued"
+    assert cache.stats["bypass"] == 2
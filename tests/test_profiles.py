@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+import config
+from profiles import load_profiles
+
+APPLICANT = {
+    "name": "a", "passport_number": "P1", "visa_number": "V1",
+    "mobile_number": "+97400000000", "email_address": "a@example.com",
+}
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_profile_without_any_recipient_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RECIPIENT_EMAIL", "")
+    with pytest.raises(ValueError, match="recipient_email"):
+        load_profiles(_write(tmp_path, [APPLICANT]))
+
+    profiles = load_profiles(_write(tmp_path, [{**APPLICANT, "recipient_email": "r@example.com"}]))
+    assert profiles[0].recipient_email == "r@example.com"
+
+
+def test_recipient_falls_back_to_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RECIPIENT_EMAIL", "env@example.com")
+    assert load_profiles(_write(tmp_path, {"applicants": [APPLICANT]}))[0].recipient_email == "env@example.com"
+
+
+@pytest.mark.parametrize("data", [[], {"applicants": []}, {"applicant": [APPLICANT]}])
+def test_file_without_applicants_is_rejected(tmp_path, monkeypatch, data):
+    monkeypatch.setattr(config, "RECIPIENT_EMAIL", "env@example.com")
+    with pytest.raises(ValueError):
+        load_profiles(_write(tmp_path, data))